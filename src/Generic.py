@@ -1,181 +1,504 @@
+import functools
+import math
+import multiprocessing
+import queue
 import random
+import time
+
+import numpy as np
+
+from bitboard import BitBoard
+from context import get_context
+from indices import get_indices
+from solver import propagate, solve
+
+
+class ConflictCounts:
+    """Column and box value counts of one chromosome, for O(1) swap scoring.
+
+    Rows stay permutations under swaps, so like population_fitness() only
+    columns and boxes can conflict. delta() reads just the two columns and
+    (when they differ) the two boxes that a swap within a row touches;
+    swap() applies it to the chromosome in place and keeps score equal to
+    the chromosome's population_fitness().
+    """
+
+    def __init__(self, chromosome):
+        self.chromosome = chromosome
+        board_size = len(chromosome)
+        self.box_of = get_context(board_size).box_of
+        self.cols = [[0] * (board_size + 1) for _ in range(board_size)]
+        self.boxes = [[0] * (board_size + 1) for _ in range(board_size)]
+        for i, row in enumerate(chromosome):
+            for j, num in enumerate(row):
+                self.cols[j][num] += 1
+                self.boxes[self.box_of[i][j]][num] += 1
+        self.score = sum(
+            board_size - sum(1 for count in unit[1:] if count)
+            for unit in self.cols + self.boxes
+        )
+
+    @staticmethod
+    def _move(counts, leaving, entering):
+        # A value whose last copy leaves adds a conflict; a new value removes one
+        return (counts[leaving] == 1) - (counts[entering] == 0)
+
+    def delta(self, row, col1, col2):
+        """Change in fitness if the cells (row, col1) and (row, col2) were swapped."""
+        first, second = self.chromosome[row][col1], self.chromosome[row][col2]
+        if first == second:
+            return 0
+        change = self._move(self.cols[col1], first, second) + self._move(self.cols[col2], second, first)
+        box1, box2 = self.box_of[row][col1], self.box_of[row][col2]
+        if box1 != box2:
+            change += self._move(self.boxes[box1], first, second) + self._move(self.boxes[box2], second, first)
+        return change
+
+    def swap(self, row, col1, col2):
+        """Swap two cells of a row and return the change in fitness."""
+        change = self.delta(row, col1, col2)
+        chromosome_row = self.chromosome[row]
+        first, second = chromosome_row[col1], chromosome_row[col2]
+        for counts in (self.cols[col1], self.boxes[self.box_of[row][col1]]):
+            counts[first] -= 1
+            counts[second] += 1
+        for counts in (self.cols[col2], self.boxes[self.box_of[row][col2]]):
+            counts[second] -= 1
+            counts[first] += 1
+        chromosome_row[col1], chromosome_row[col2] = second, first
+        self.score += change
+        return change
+
+
+# Every supported board (up to 25x25) fits its numbers in one byte, so the
+# arrays below are uint8: a population is one flat buffer, 8x smaller than
+# the default int64, and copying a chromosome is a single memcpy.
+GENE_DTYPE = np.uint8
+
+
+def grid_array(grid):
+    """Return grid (lists or an array) as an (n, n) GENE_DTYPE array."""
+    return np.asarray(grid, dtype=GENE_DTYPE)
+
+
+def fixed_mask(grid):
+    """Boolean (n, n) mask of the given (non-zero) cells of grid."""
+    return grid_array(grid) != 0
+
+
+def make_population_array(count, grid, rng):
+    """Generate an initial population as a (count, n, n) GENE_DTYPE array.
+
+    Every row keeps the fixed cells of grid and holds a random permutation
+    of the missing numbers in its free cells.
+    """
+    grid = grid_array(grid)
+    size = grid.shape[0]
+    population = np.broadcast_to(grid, (count, size, size)).copy()
+    for i in range(size):
+        free = np.flatnonzero(grid[i] == 0)
+        missing = np.setdiff1d(np.arange(1, size + 1, dtype=GENE_DTYPE), grid[i])
+        population[:, i, free] = rng.permuted(np.broadcast_to(missing, (count, len(missing))), axis=1)
+    return population
+
+
+@functools.lru_cache(maxsize=None)
+def _scored_units(size):
+    """Flat cell indices of the columns and boxes as a (2n, n) array."""
+    return np.asarray(get_indices(size).units[size:], dtype=np.intp)
+
+
+def units_view(population):
+    """Stack the columns and boxes of every chromosome into a (pop, 2n, n) array."""
+    count, size, _ = population.shape
+    return np.take(population.reshape(count, size * size), _scored_units(size), axis=1)
+
+
+def population_fitness(population):
+    """Vectorized fitness: column and box conflicts of every chromosome at once.
+
+    Rows are permutations by construction, so only columns and boxes are
+    scored: each unit contributes n minus its distinct values.
+    """
+    units = units_view(population)
+    count, unit_count, size = units.shape
+    # Mark (unit, value) presence in one flat boolean buffer
+    offsets = np.arange(count * unit_count).reshape(count, unit_count, 1) * (size + 1)
+    present = np.zeros(count * unit_count * (size + 1), dtype=bool)
+    present[(offsets + units).ravel()] = True
+    distinct = present.reshape(count, unit_count, size + 1).sum(axis=(1, 2))
+    return unit_count * size - distinct
+
+
+def select_parents(scores, count, rng, k=5):
+    """Tournament selection for count parents; returns population indices."""
+    entrants = rng.integers(0, len(scores), size=(count, k))
+    return entrants[np.arange(count), np.argmin(scores[entrants], axis=1)]
+
+
+def crossover_population(population, first, second, rng):
+    """Build one child per parent pair by taking each row from either parent."""
+    take_first = rng.random(first.shape + (population.shape[1],)) < 0.5
+    return np.where(take_first[:, :, None], population[first], population[second])
+
+
+def mutate_population(children, fixed, probability, rng):
+    """Swap two mutable cells in each row selected with the given probability."""
+    count, size, _ = children.shape
+    mutable_count = (~fixed).sum(axis=1)
+    selected = (rng.random((count, size)) < probability) & (mutable_count >= 2)
+    child_idx, row_idx = np.nonzero(selected)
+    if len(child_idx) == 0:
+        return children
+    # Random keys with fixed cells pushed last: the two smallest are mutable
+    keys = rng.random((len(row_idx), size)) + fixed[row_idx]
+    picks = np.argpartition(keys, 1, axis=1)[:, :2]
+    col1, col2 = picks[:, 0], picks[:, 1]
+    first = children[child_idx, row_idx, col1]
+    children[child_idx, row_idx, col1] = children[child_idx, row_idx, col2]
+    children[child_idx, row_idx, col2] = first
+    return children
+
+
+def evolve(population, scores, fixed, mutation_prob, rng, elite_size):
+    """Produce the next generation and its fitness scores.
+
+    Only the children are scored; the elite keep the scores they came with.
+    """
+    # Elitism: Keep the best solutions
+    elite_idx = np.argsort(scores, kind="stable")[:elite_size]
+    elite = population[elite_idx]
+
+    # Generate rest of the population
+    child_count = len(population) - elite_size
+    parent1 = select_parents(scores, child_count, rng)
+    parent2 = select_parents(scores, child_count, rng)
+    children = crossover_population(population, parent1, parent2, rng)
+    children = mutate_population(children, fixed, mutation_prob, rng)
+
+    return np.concatenate((elite, children)), np.concatenate((scores[elite_idx], population_fitness(children)))
+
+
+def adapt_mutation(mutation_prob, stagnation_counter):
+    """Raise the mutation rate while the search stagnates, lower it otherwise."""
+    if stagnation_counter > 20:
+        return min(0.8, mutation_prob * 1.1)
+    return max(0.1, mutation_prob * 0.9)
+
+
+def genetic_algorithm(initial_grid, population_size=7000, generations=1200, mutation_prob=0.2, progress_callback=None, seed=None, stats=None):
+    """Run the genetic algorithm to solve Sudoku.
+
+    The population is one (population_size, n, n) array and its fitness is
+    computed in a single vectorized pass per generation, then reused for
+    elitism, tournaments and progress reporting. If a stats dict is given it
+    receives the number of generations run and the best fitness.
+    """
+    rng = np.random.default_rng(seed)
+    fixed = fixed_mask(initial_grid)
 
-# Global board size and sub-box size
-global board_size
-global INITIAL_SUDOKU
-
-def make_gene(row):
-    """Create a shuffled row while respecting fixed cells."""
-    fixed_positions = {i: val for i, val in enumerate(row) if val != 0}
-    available_numbers = set(range(1, board_size + 1)) - set(fixed_positions.values())
-    gene = [0] * board_size
-    
-    # Place fixed numbers first
-    for pos, val in fixed_positions.items():
-        gene[pos] = val
-    
-    # Fill remaining positions
-    available_positions = [i for i in range(board_size) if i not in fixed_positions]
-    available_numbers = list(available_numbers)
-    random.shuffle(available_numbers)
-    
-    for pos, num in zip(available_positions, available_numbers):
-        gene[pos] = num
-    
-    return gene
-
-def make_chromosome(grid):
-    """Create a full Sudoku board as a chromosome."""
-    return [make_gene(row) for row in grid]
-
-def make_population(count, grid):
-    """Generate an initial population."""
-    return [make_chromosome(grid) for _ in range(count)]
-
-def fitness(chromosome):
-    """Calculate conflicts in rows, columns, and boxes."""
-    conflicts = 0
-    box_size = int(board_size ** 0.5)
-
-    # Column conflicts
-    for col in range(board_size):
-        column = [chromosome[row][col] for row in range(board_size)]
-        conflicts += len(column) - len(set(column))
-
-    # Box conflicts
-    for box_row in range(0, board_size, box_size):
-        for box_col in range(0, board_size, box_size):
-            box = []
-            for i in range(box_size):
-                for j in range(box_size):
-                    box.append(chromosome[box_row + i][box_col + j])
-            conflicts += len(box) - len(set(box))
-
-    return conflicts
-
-def repair_chromosome(chromosome):
-    """Repair invalid chromosomes to maintain Sudoku constraints."""
-    for i in range(board_size):
-        fixed_positions = {j: val for j, val in enumerate(INITIAL_SUDOKU[i]) if val != 0}
-        row = chromosome[i]
-        
-        # Check for duplicates in non-fixed positions
-        numbers = list(range(1, board_size + 1))
-        used_numbers = set(fixed_positions.values())
-        available_numbers = [n for n in numbers if n not in used_numbers]
-        
-        # Get positions that need fixing
-        non_fixed_positions = [j for j in range(board_size) if j not in fixed_positions]
-        current_values = [row[j] for j in non_fixed_positions]
-        
-        # Fix duplicates
-        if len(set(current_values)) != len(current_values):
-            random.shuffle(available_numbers)
-            for pos, num in zip(non_fixed_positions, available_numbers):
-                row[pos] = num
-                
-    return chromosome
-
-def mutation(chromosome, probability):
-    """Enhanced mutation that swaps two mutable cells within a row."""
-    mutated = [row[:] for row in chromosome]
-    
-    for i in range(board_size):
-        if random.random() < probability:
-            mutable_indices = [j for j in range(board_size) if INITIAL_SUDOKU[i][j] == 0]
-            if len(mutable_indices) > 1:
-                idx1, idx2 = random.sample(mutable_indices, 2)
-                mutated[i][idx1], mutated[i][idx2] = mutated[i][idx2], mutated[i][idx1]
-    
-    return repair_chromosome(mutated)
-
-def crossover(parent1, parent2):
-    """Improved crossover with repair mechanism."""
-    child = []
-    for i, (row1, row2) in enumerate(zip(parent1, parent2)):
-        fixed_positions = {j: val for j, val in enumerate(INITIAL_SUDOKU[i]) if val != 0}
-        
-        # Create child row
-        if random.random() < 0.5:
-            child_row = row1[:]
-        else:
-            child_row = row2[:]
-            
-        # Ensure fixed positions are maintained
-        for pos, val in fixed_positions.items():
-            child_row[pos] = val
-            
-        child.append(child_row)
-    
-    return repair_chromosome(child)
-
-def tournament_selection(population, k=5):
-    """Select the best individual from k random solutions."""
-    tournament = random.sample(population, k)
-    return min(tournament, key=fitness)
-
-def genetic_algorithm(initial_grid, population_size=7000, generations=1200, mutation_prob=0.2, progress_callback=None):
-    """Run the genetic algorithm to solve Sudoku."""
-    global INITIAL_SUDOKU
-    INITIAL_SUDOKU = initial_grid
-    
     # Initialize population
-    population = make_population(population_size, initial_grid)
-    population = [repair_chromosome(chrom) for chrom in population]
-    
-    best_solution = min(population, key=fitness)
-    best_score = fitness(best_solution)
-    
+    population = make_population_array(population_size, initial_grid, rng)
+    scores = population_fitness(population)
+
+    best_index = int(np.argmin(scores))
+    best_solution = population[best_index].copy()
+    best_score = int(scores[best_index])
+
     stagnation_counter = 0
-    last_best_score = best_score
+    elite_size = max(1, population_size // 10)
+    if stats is not None:
+        stats["generations"], stats["fitness"] = 0, best_score
 
     for generation in range(generations):
-        # Create next generation
-        next_population = []
-        
-        # Elitism: Keep the best 10% solutions
-        elite_size = max(1, population_size // 10)
-        sorted_population = sorted(population, key=fitness)
-        next_population.extend(sorted_population[:elite_size])
-        
-        # Generate rest of the population
-        while len(next_population) < population_size:
-            parent1 = tournament_selection(population)
-            parent2 = tournament_selection(population)
-            child = crossover(parent1, parent2)
-            child = mutation(child, mutation_prob)
-            next_population.append(child)
-        
-        population = next_population
-        current_best = min(population, key=fitness)
-        current_score = fitness(current_best)
-        
+        population, scores = evolve(population, scores, fixed, mutation_prob, rng, elite_size)
+        current_index = int(np.argmin(scores))
+        current_score = int(scores[current_index])
+
         # Update best solution
         if current_score < best_score:
-            best_solution = current_best
+            best_solution = population[current_index].copy()
             best_score = current_score
             stagnation_counter = 0
         else:
             stagnation_counter += 1
-        
-        # Adaptive mutation rate
-        if stagnation_counter > 20:
-            mutation_prob = min(0.8, mutation_prob * 1.1)
-        else:
-            mutation_prob = max(0.1, mutation_prob * 0.9)
-        
+
+        mutation_prob = adapt_mutation(mutation_prob, stagnation_counter)
+
         # Update GUI
         if progress_callback:
-            progress_callback(current_best)
-        
+            progress_callback(population[current_index].tolist())
+
+        if stats is not None:
+            stats["generations"], stats["fitness"] = generation + 1, best_score
+
         # Early stopping condition
         if best_score == 0:
-            print(f"Perfect solution found at generation {generation}")
-            return best_solution
-            
-        # Print progress
-        if generation % 100 == 0:
-            print(f"Generation {generation}: Best Fitness = {best_score}, Mutation Rate = {mutation_prob:.3f}")
-    
-    print("No perfect solution found within the given generations.")
-    return best_solution
\ No newline at end of file
+            break
+
+    return best_solution.tolist()
+
+
+def candidate_rows(board, row, count, rng):
+    """Return up to count fillings of the empty cells of a row, as value lists.
+
+    Cells are filled most constrained first with a random number that is
+    still a candidate there; a draw that gets stuck falls back to a random
+    permutation of the remaining numbers. rng is a random.Random.
+    """
+    cells = [col for col in range(board.size) if board.grid[row][col] == 0]
+    masks = {col: board.candidates(row, col) for col in cells}
+    order = sorted(cells, key=lambda col: masks[col].bit_count())
+    missing = [num for num in range(1, board.size + 1) if not (board.rows[row] >> (num - 1)) & 1]
+    fillings = []
+    for _ in range(count):
+        left = missing[:]
+        values = {}
+        for col in order:
+            options = [num for num in left if (masks[col] >> (num - 1)) & 1] or left
+            values[col] = rng.choice(options)
+            left.remove(values[col])
+        fillings.append([values[col] for col in cells])
+    return cells, fillings
+
+
+def seed_population(count, board, rng, local, variants=200):
+    """Population like make_population_array(), with rows drawn from candidate_rows()."""
+    population = np.broadcast_to(grid_array(board.grid), (count, board.size, board.size)).copy()
+    for i in range(board.size):
+        cells, fillings = candidate_rows(board, i, min(count, variants), local)
+        if cells:
+            population[:, i, cells] = grid_array(fillings)[rng.integers(0, len(fillings), count)]
+    return population
+
+
+def anneal(chromosome, mutable, rng, steps, candidates=None, temperature=0.5, cooling=0.9995):
+    """Simulated annealing over swaps of two mutable cells within a row.
+
+    chromosome is a list of rows, mutable[i] the columns of row i that may
+    move and rng a random.Random. With candidates (per-cell bitmasks) swaps
+    that would put a number where it is not a candidate are skipped. Every
+    other swap is scored by ConflictCounts.delta(); worse swaps are accepted
+    with probability exp(-delta / temperature), and the temperature decays
+    by cooling per step. Returns (best chromosome, its fitness), stopping
+    early at 0.
+    """
+    counts = ConflictCounts([row[:] for row in chromosome])
+    grid = counts.chromosome
+    rows = [i for i, columns in enumerate(mutable) if len(columns) > 1]
+    best, best_score = [row[:] for row in grid], counts.score
+    if not rows:
+        return best, best_score
+    for _ in range(steps):
+        if counts.score == 0:
+            break
+        row = rng.choice(rows)
+        col1, col2 = rng.sample(mutable[row], 2)
+        if candidates and not (
+            (candidates[row][col2] >> (grid[row][col1] - 1)) & 1 and (candidates[row][col1] >> (grid[row][col2] - 1)) & 1
+        ):
+            continue
+        change = counts.delta(row, col1, col2)
+        if change <= 0 or rng.random() < math.exp(-change / temperature):
+            counts.swap(row, col1, col2)
+            if counts.score < best_score:
+                best, best_score = [line[:] for line in grid], counts.score
+        temperature = max(0.02, temperature * cooling)
+    return best, best_score
+
+
+def hybrid_genetic_algorithm(initial_grid, population_size=1000, generations=1200, mutation_prob=0.2,
+                             progress_callback=None, seed=None, stats=None, time_limit=5.0,
+                             patience=20, anneal_steps=20000, stall_searches=3):
+    """Genetic algorithm with local search and an exact fallback.
+
+    Naked and hidden singles are placed first and kept fixed, so the
+    population only varies the cells propagation could not decide, and
+    rows start from numbers that are candidates in their cells. When the
+    best fitness has not improved for patience generations, the best
+    chromosome is improved by anneal() and put back in place of the worst
+    one. If no solution is found within generations or time_limit seconds,
+    or stall_searches local searches in a row end without a better best
+    fitness than the previous one left, the puzzle is finished by the
+    exact MRV search of solver.py. stats, if given, receives generations,
+    fitness, local_searches and fallback.
+    """
+    start = time.monotonic()
+    rng = np.random.default_rng(seed)
+    local = random.Random(int(rng.integers(1 << 62)))
+    board = BitBoard([row[:] for row in initial_grid])
+    if stats is not None:
+        stats.update(generations=0, fitness=0, local_searches=0, fallback=False)
+    if not board.valid or not propagate(board, board.context.units, []):
+        if stats is not None:
+            stats.update(fitness=None, fallback=True)
+        return [row[:] for row in initial_grid]  # propagation proved there is no solution
+    seeded = board.grid
+    if all(all(row) for row in seeded):
+        return seeded
+
+    fixed = fixed_mask(seeded)
+    mutable = [np.flatnonzero(~row).tolist() for row in fixed]
+    candidates = [[board.candidates(row, col) for col in range(board.size)] for row in range(board.size)]
+    population = seed_population(population_size, board, rng, local)
+    scores = population_fitness(population)
+    best_index = int(np.argmin(scores))
+    best_solution, best_score = population[best_index].copy(), int(scores[best_index])
+    stagnation_counter = 0
+    searched_score, stalled_searches = best_score, 0  # best fitness at the last local search
+    elite_size = max(1, population_size // 10)
+
+    for generation in range(generations):
+        if best_score == 0 or stalled_searches >= stall_searches or time.monotonic() - start > time_limit:
+            break
+        population, scores = evolve(population, scores, fixed, mutation_prob, rng, elite_size)
+        current_index = int(np.argmin(scores))
+        if scores[current_index] < best_score:
+            best_solution, best_score = population[current_index].copy(), int(scores[current_index])
+            stagnation_counter = 0
+        else:
+            stagnation_counter += 1
+        mutation_prob = adapt_mutation(mutation_prob, stagnation_counter)
+
+        if stagnation_counter >= patience:
+            chromosome, score = anneal(best_solution.tolist(), mutable, local, anneal_steps, candidates)
+            worst = int(np.argmax(scores))
+            population[worst], scores[worst] = chromosome, score
+            if score < best_score:
+                best_solution, best_score = population[worst].copy(), score
+            stagnation_counter = 0
+            stalled_searches = stalled_searches + 1 if best_score >= searched_score else 0
+            searched_score = min(searched_score, best_score)
+            if stats is not None:
+                stats["local_searches"] += 1
+
+        if progress_callback:
+            progress_callback(best_solution.tolist())
+        if stats is not None:
+            stats["generations"], stats["fitness"] = generation + 1, best_score
+
+    if best_score == 0:
+        return best_solution.tolist()
+    result = solve(initial_grid, len(initial_grid), method="mrv")
+    if stats is not None:
+        stats["fallback"] = True
+    if result.solved:
+        if stats is not None:
+            stats["fitness"] = 0
+        return result.grid
+    return best_solution.tolist()
+
+
+def _island(index, initial_grid, population_size, generations, mutation_prob, seed,
+            migration_interval, migrants, inbox, outbox, results, stop_event):
+    """Evolve one island, exchanging its best chromosomes along a ring."""
+    outbox.cancel_join_thread()  # unread migrants must not block shutdown
+    rng = np.random.default_rng(seed)
+    fixed = fixed_mask(initial_grid)
+    population = make_population_array(population_size, initial_grid, rng)
+    scores = population_fitness(population)
+    best_index = int(np.argmin(scores))
+    best_solution, best_score = population[best_index].copy(), int(scores[best_index])
+    stagnation_counter = 0
+    elite_size = max(1, population_size // 10)
+    evolved = 0
+
+    for generation in range(generations):
+        if best_score == 0 or stop_event.is_set():
+            break
+        population, scores = evolve(population, scores, fixed, mutation_prob, rng, elite_size)
+        evolved += 1
+        current_index = int(np.argmin(scores))
+        if scores[current_index] < best_score:
+            best_solution, best_score = population[current_index].copy(), int(scores[current_index])
+            stagnation_counter = 0
+        else:
+            stagnation_counter += 1
+        mutation_prob = adapt_mutation(mutation_prob, stagnation_counter)
+
+        if best_score == 0:
+            stop_event.set()  # tell every other island to stop
+        elif (generation + 1) % migration_interval == 0:
+            order = np.argsort(scores, kind="stable")
+            outbox.put(population[order[:migrants]])
+            try:
+                incoming = inbox.get_nowait()
+            except queue.Empty:
+                pass
+            else:
+                # Immigrants replace the worst chromosomes
+                worst = order[len(order) - len(incoming):]
+                population[worst] = incoming
+                scores[worst] = population_fitness(incoming)
+            results.put(("progress", index, best_score, best_solution, evolved))
+
+    results.put(("done", index, best_score, best_solution, evolved))
+
+
+def island_genetic_algorithm(initial_grid, islands=4, migration_interval=50, migrants=None,
+                             population_size=7000, generations=1200, mutation_prob=0.2,
+                             progress_callback=None, seed=None, stats=None):
+    """Run the genetic algorithm as an island model across processes.
+
+    population_size is split evenly over the islands. Every
+    migration_interval generations each island sends its best migrants
+    chromosomes (default 5% of the island) to the next island in a ring and
+    replaces its worst ones with whatever has arrived. As soon as one island
+    reaches fitness 0 all islands stop. If an island process dies the
+    others are stopped and RuntimeError is raised. If stats is a dict,
+    "generations" is set to the most generations any island ran.
+    """
+    island_size = max(2, population_size // islands)
+    if migrants is None:
+        migrants = max(1, island_size // 20)
+    seeds = np.random.SeedSequence(seed).spawn(islands)
+
+    context = multiprocessing.get_context()
+    inboxes = [context.Queue() for _ in range(islands)]
+    results = context.Queue()
+    stop_event = context.Event()
+    workers = [
+        context.Process(
+            target=_island,
+            args=(i, initial_grid, island_size, generations, mutation_prob, seeds[i],
+                  migration_interval, migrants, inboxes[i], inboxes[(i + 1) % islands], results, stop_event),
+            daemon=True,
+        )
+        for i in range(islands)
+    ]
+    for worker in workers:
+        worker.start()
+
+    best_solution, best_score = None, None
+    evolved = [0] * islands
+    running = islands
+    try:
+        while running:
+            try:
+                kind, index, score, solution, evolved[index] = results.get(timeout=0.5)
+            except queue.Empty:
+                # An island that raised or was killed never reports "done"
+                for index, worker in enumerate(workers):
+                    if worker.exitcode not in (None, 0):
+                        raise RuntimeError(f"Island {index} died with exit code {worker.exitcode}")
+                continue
+            if kind == "done":
+                running -= 1
+            if best_score is None or score < best_score:
+                best_solution, best_score = solution, score
+                if progress_callback:
+                    progress_callback(best_solution.tolist())
+            if best_score == 0:
+                stop_event.set()
+    except BaseException:
+        stop_event.set()
+        for worker in workers:
+            worker.terminate()
+        raise
+    finally:
+        for worker in workers:
+            worker.join()
+
+    if stats is not None:
+        stats["generations"] = max(evolved)
+    return best_solution.tolist()
@@ -1,13 +1,9 @@
-from utils import check_location_is_safe
-import matplotlib.pyplot as plt
-global board_size
+def plot_statistics(instrumentation):
+    """Plot the cells solved and the backtracks over the steps recorded by a solve."""
+    import matplotlib.pyplot as plt  # imported lazily: only the GUI plots, and it needs a display
 
-# Initialize global variables for statistics
-steps = []
-cells_solved = []
-backtracking_steps = []
+    steps, cells_solved, backtracking_steps = instrumentation.series("step", "step", "solved", "backtracks")
 
-def plot_statistics():
     # Plot the cells solved over time
     plt.figure(figsize=(10, 6))
     plt.plot(steps, cells_solved, label="Cells Solved", color="green")
@@ -24,53 +20,3 @@ def plot_statistics():
     plt.legend(loc="upper left")
 
     plt.show()
-
-def solve_sudoku_async(arr, empty_cells, SL, NSL, DE, update_gui, root, delay=0):
-    if len(SL) == len(empty_cells):  # Base case: solved
-        print(f"Sudoku solved! Steps taken: {len(SL)}")
-        update_gui(arr)
-        plot_statistics()  # Plot the data once solved
-        return True
-
-    if NSL:
-        CS, last_num, tried_nums = NSL.pop()
-        row, col = CS
-        print(f"Trying cell ({row}, {col}). Previously tried numbers: {tried_nums}")
-
-        for num in range(last_num + 1, board_size + 1):
-            if num not in tried_nums and check_location_is_safe(arr, row, col, num):
-                arr[row][col] = num
-                SL.append(CS)
-                NSL.append((CS, num, tried_nums + [num]))
-                print(f"Placed {num} in cell ({row}, {col}). Cells solved: {len(SL)}/{len(empty_cells)}")
-
-                # Update statistics
-                steps.append(len(steps) + 1)
-                cells_solved.append(len(SL))
-                backtracking_steps.append(len(DE))
-
-                update_gui(arr)
-
-                if len(SL) < len(empty_cells):
-                    next_cell = empty_cells[len(SL)]
-                    NSL.append((next_cell, 0, []))
-
-                # Schedule the next step after a delay
-                root.after(delay, lambda: solve_sudoku_async(arr, empty_cells, SL, NSL, DE, update_gui, root, delay))
-                return True
-        else:
-            # Backtrack if no valid numbers
-            if SL:
-                DE.append(SL.pop())
-                arr[row][col] = 0
-                print(f"Backtracking from cell ({row}, {col}). Backtracks so far: {len(DE)}")
-
-                # Update statistics
-                steps.append(len(steps) + 1)
-                cells_solved.append(len(SL))
-                backtracking_steps.append(len(DE))
-
-                update_gui(arr)
-                root.after(delay, lambda: solve_sudoku_async(arr, empty_cells, SL, NSL, DE, update_gui, root, delay))
-                return True
-    return False
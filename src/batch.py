@@ -0,0 +1,159 @@
+import itertools
+import math
+import os
+import sys
+import time
+from collections import deque
+
+from solver import solve
+
+# Symbols for the digits 1..25; a blank cell is written as "." or "0"
+ALPHABET = "123456789ABCDEFGHIJKLMNOP"
+BLANKS = ".0"
+
+
+def parse_puzzle(line):
+    """Parse a one-line puzzle (16, 81, 256 or 625 characters) into a grid."""
+    line = line.strip()
+    board_size = math.isqrt(len(line))
+    if board_size * board_size != len(line) or math.isqrt(board_size) ** 2 != board_size:
+        raise ValueError(f"A puzzle line must have 16, 81, 256 or 625 characters, got {len(line)}")
+    values = []
+    for char in line.upper():
+        if char in BLANKS:
+            values.append(0)
+        else:
+            num = ALPHABET.find(char) + 1
+            if not 1 <= num <= board_size:
+                raise ValueError(f"Invalid symbol {char!r} for a {board_size}x{board_size} puzzle")
+            values.append(num)
+    return [values[row * board_size:(row + 1) * board_size] for row in range(board_size)]
+
+
+def format_grid(grid):
+    """Write a grid back in the one-line format."""
+    return "".join(ALPHABET[num - 1] if num else "." for row in grid for num in row)
+
+
+def solve_line(line, method="dlx"):
+    """Solve one puzzle line; returns (solution line or None, seconds)."""
+    start = time.perf_counter()
+    grid = parse_puzzle(line)
+    result = solve(grid, len(grid), method=method)
+    solution = format_grid(result.grid) if result.solved else None
+    return solution, time.perf_counter() - start
+
+
+def solve_grid(grid, method="dlx", options=None):
+    """Solve one grid in a pool worker; returns the result as a JSON-ready dict."""
+    result = solve(grid, len(grid), method=method, **(options or {}))
+    return {
+        "solved": result.solved,
+        "solution": result.grid,
+        "nodes": result.nodes,
+        "backtracks": result.backtracks,
+        "generations": result.generations,
+        "solve_ms": round(result.elapsed * 1000, 3),
+    }
+
+
+def warm_up():
+    """Import the genetic solver in a pool worker before its first request needs it."""
+    import Generic  # noqa: F401
+    import numpy.random  # noqa: F401  # NumPy defers it to the first np.random access
+    return True
+
+
+def serve_requests(connection):
+    """Worker process of service.py: solve (grid, method, options) tasks from a pipe.
+
+    Sends "ready" once warmed up, then one ("ok", result) or ("error",
+    message) reply per task, and returns when the pipe is closed. The
+    worker leads its own process group, so the service can kill a solve
+    that overruns its timeout together with any processes it started.
+    """
+    if hasattr(os, "setpgrp"):
+        os.setpgrp()
+    warm_up()
+    connection.send("ready")
+    while True:
+        try:
+            task = connection.recv()
+        except EOFError:
+            return
+        try:
+            reply = ("ok", solve_grid(*task))
+        except Exception as error:
+            reply = ("error", f"{type(error).__name__}: {error}")
+        connection.send(reply)
+
+
+def _solve_chunk(lines, method):
+    results = []
+    for line in lines:
+        try:
+            results.append(solve_line(line, method))
+        except ValueError as error:
+            results.append((None, 0.0, str(error)))
+    return results
+
+
+def solve_stream(lines, method="dlx", workers=1, chunk_size=256):
+    """Solve puzzles from an iterable of lines, yielding results in input order.
+
+    Blank lines are skipped. Each result is (solution line or None, seconds)
+    or (None, 0.0, error message) for a malformed line. Puzzles are sent to
+    a process pool in chunks and at most two chunks per worker are in
+    flight, so memory stays bounded however long the input is.
+    """
+    puzzles = (line for line in lines if line.strip())
+    chunks = iter(lambda: list(itertools.islice(puzzles, chunk_size)), [])
+    if workers <= 1:
+        for chunk in chunks:
+            yield from _solve_chunk(chunk, method)
+        return
+
+    from concurrent.futures import ProcessPoolExecutor  # imported lazily: pulls in logging
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        for chunk in chunks:
+            pending.append(pool.submit(_solve_chunk, chunk, method))
+            if len(pending) >= 2 * workers:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
+
+
+def run_batch(source, output, method="dlx", workers=1, chunk_size=256):
+    """Solve every puzzle from source and write one tab-separated line per puzzle.
+
+    Each output line is the solution (or "unsolved"/"error: ...") followed by
+    the solve time in milliseconds. Returns the number of puzzles solved.
+    """
+    solved = 0
+    for result in solve_stream(source, method, workers, chunk_size):
+        solution, seconds = result[0], result[1]
+        if solution is not None:
+            solved += 1
+            output.write(f"{solution}\t{seconds * 1000:.3f}\n")
+        elif len(result) == 3:
+            output.write(f"error: {result[2]}\t{seconds * 1000:.3f}\n")
+        else:
+            output.write(f"unsolved\t{seconds * 1000:.3f}\n")
+    output.flush()
+    return solved
+
+
+def main(args):
+    source = sys.stdin if args.input == "-" else open(args.input)
+    output = sys.stdout if args.output == "-" else open(args.output, "w")
+    try:
+        start = time.perf_counter()
+        solved = run_batch(source, output, args.method, args.workers, args.chunk_size)
+        print(f"Solved {solved} puzzles in {time.perf_counter() - start:.2f}s", file=sys.stderr)
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        if output is not sys.stdout:
+            output.close()
@@ -0,0 +1,241 @@
+import os
+import sys
+import time
+
+from batch import parse_puzzle, warm_up
+from solver import is_solution, solve
+
+PUZZLE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "puzzles")
+
+# Bundled corpora: one puzzle per line in the batch format
+CORPORA = {
+    "4x4": "4x4.txt",
+    "easy": "easy.txt",
+    "hard": "hard.txt",
+    "17clue": "17clue.txt",
+    "16x16": "16x16.txt",
+}
+
+# Options per backend that keep every run bounded
+BACKENDS = {
+    "ordered": {"max_nodes": 200_000},
+    "mrv": {},
+    "dlx": {},
+    "genetic": {"population_size": 2000, "generations": 200},
+    "hybrid": {"population_size": 500, "time_limit": 2.0},
+    "island": {"islands": 2, "population_size": 2000, "generations": 200},
+}
+DEFAULT_BACKENDS = ["ordered", "mrv", "dlx"]
+GENETIC_BACKENDS = ("genetic", "hybrid", "island")  # seeded, and import Generic (NumPy) lazily
+
+# Cold-import budgets in milliseconds, measured in a fresh interpreter.
+# Pool workers import the solver modules (spawned ones main.py as well,
+# and with it this module), so these must stay clear of Tk, matplotlib
+# and NumPy; only the modules listed in HEAVY_ALLOWED may load them.
+IMPORT_BUDGET_MS = 25
+IMPORT_BUDGETS = {"service": 120, "grader": 300, "Generic": 300, "session": 300, "gui": 100}
+IMPORT_MODULES = [
+    "solver", "dlx", "bitboard", "batch", "generator", "cache", "hints", "backtracking",
+    "instrument", "portfolio", "benchmark", "main", "service", "grader", "Generic", "session", "gui",
+]
+HEAVY_MODULES = ("tkinter", "matplotlib", "numpy")
+HEAVY_ALLOWED = {"grader": ("numpy",), "Generic": ("numpy",), "session": ("numpy",), "gui": ("tkinter",)}
+
+CSV_FIELDS = [
+    "corpus", "index", "backend", "board_size", "clues", "solved",
+    "wall_ms", "nodes", "backtracks", "generations", "peak_kib",
+]
+
+
+def load_corpus(name):
+    """Return the puzzle lines of a bundled corpus."""
+    with open(os.path.join(PUZZLE_DIR, CORPORA[name])) as corpus:
+        return [line.strip() for line in corpus if line.strip()]
+
+
+def _run(grid, backend, seed):
+    options = dict(BACKENDS[backend])
+    if backend in GENETIC_BACKENDS:
+        options["seed"] = seed
+    return solve(grid, len(grid), method=backend, **options)
+
+
+def run_one(corpus, index, line, backend, seed=0, measure_memory=True):
+    """Benchmark one backend on one puzzle and return a record dict.
+
+    The timed run is untraced; peak memory comes from a second run under
+    tracemalloc so tracing does not distort the wall time.
+    """
+    grid = parse_puzzle(line)
+    result = _run(grid, backend, seed)
+    peak = None
+    if measure_memory:
+        import tracemalloc
+
+        tracemalloc.start()
+        _run(grid, backend, seed)
+        peak = tracemalloc.get_traced_memory()[1] / 1024
+        tracemalloc.stop()
+    return {
+        "corpus": corpus,
+        "index": index,
+        "backend": backend,
+        "board_size": len(grid),
+        "clues": sum(1 for row in grid for value in row if value),
+        "solved": is_solution(result.grid, grid),
+        "wall_ms": round(result.elapsed * 1000, 3),
+        "nodes": result.nodes,
+        "backtracks": result.backtracks,
+        "generations": result.generations,
+        "peak_kib": None if peak is None else round(peak, 1),
+    }
+
+
+def run_benchmark(corpora=None, backends=None, seed=0, measure_memory=True, progress=None):
+    """Run every backend over every corpus; returns the list of records.
+
+    The genetic, hybrid and island backends are seeded with seed + puzzle
+    index so reruns are reproducible. Their lazy import of Generic (and
+    NumPy) is done before the first run, so it is not timed as part of it.
+    """
+    backends = backends or DEFAULT_BACKENDS
+    if any(backend in GENETIC_BACKENDS for backend in backends):
+        warm_up()
+    records = []
+    for corpus in corpora or list(CORPORA):
+        for index, line in enumerate(load_corpus(corpus)):
+            for backend in backends:
+                record = run_one(corpus, index, line, backend, seed + index, measure_memory)
+                records.append(record)
+                if progress:
+                    progress(record)
+    return records
+
+
+def summarize(records):
+    """Aggregate records per (corpus, backend)."""
+    import statistics
+
+    groups = {}
+    for record in records:
+        groups.setdefault((record["corpus"], record["backend"]), []).append(record)
+    summary = []
+    for (corpus, backend), group in groups.items():
+        times = [record["wall_ms"] for record in group]
+        peaks = [record["peak_kib"] for record in group if record["peak_kib"] is not None]
+        summary.append({
+            "corpus": corpus,
+            "backend": backend,
+            "puzzles": len(group),
+            "solved": sum(record["solved"] for record in group),
+            "total_ms": round(sum(times), 3),
+            "median_ms": round(statistics.median(times), 3),
+            "max_ms": max(times),
+            "nodes": sum(record["nodes"] for record in group),
+            "backtracks": sum(record["backtracks"] for record in group),
+            "generations": sum(record["generations"] for record in group),
+            "peak_kib": max(peaks) if peaks else None,
+        })
+    return summary
+
+
+def metadata(seed):
+    import platform
+
+    return {
+        "seed": seed,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+
+
+def write_json(path, records, seed=0):
+    import json
+
+    with open(path, "w") as output:
+        json.dump({"metadata": metadata(seed), "summary": summarize(records), "records": records}, output, indent=2)
+
+
+def write_csv(path, records):
+    import csv
+
+    with open(path, "w", newline="") as output:
+        writer = csv.DictWriter(output, fieldnames=CSV_FIELDS)
+        writer.writeheader()
+        writer.writerows(records)
+
+
+def print_summary(summary):
+    print(f"{'corpus':<8} {'backend':<8} {'solved':>8} {'total ms':>11} {'median ms':>10} {'nodes':>10} {'gens':>6} {'peak KiB':>9}")
+    for row in summary:
+        peak = "-" if row["peak_kib"] is None else f"{row['peak_kib']:.0f}"
+        print(
+            f"{row['corpus']:<8} {row['backend']:<8} {row['solved']:>4}/{row['puzzles']:<3} "
+            f"{row['total_ms']:>11.1f} {row['median_ms']:>10.2f} {row['nodes']:>10} {row['generations']:>6} {peak:>9}"
+        )
+
+
+def measure_import(module, repeat=3):
+    """Import module in fresh interpreters; returns (best milliseconds, heavy modules it loaded)."""
+    import subprocess
+
+    code = (
+        "import sys, time\n"
+        "start = time.perf_counter()\n"
+        f"import {module}\n"
+        "elapsed = time.perf_counter() - start\n"
+        f"print(elapsed, *[name for name in {HEAVY_MODULES!r} if name in sys.modules])"
+    )
+    src = os.path.dirname(os.path.abspath(__file__))
+    best, heavy = None, []
+    for _ in range(repeat):
+        output = subprocess.run([sys.executable, "-c", code], cwd=src, capture_output=True, text=True, check=True)
+        seconds, *heavy = output.stdout.split()
+        best = min(best or float("inf"), float(seconds) * 1000)
+    return best, heavy
+
+
+def check_imports(modules=None):
+    """Measure every module against its import budget; returns one record per module."""
+    records = []
+    for module in modules or IMPORT_MODULES:
+        ms, heavy = measure_import(module)
+        budget = IMPORT_BUDGETS.get(module, IMPORT_BUDGET_MS)
+        unexpected = [name for name in heavy if name not in HEAVY_ALLOWED.get(module, ())]
+        records.append({
+            "module": module,
+            "import_ms": round(ms, 2),
+            "budget_ms": budget,
+            "heavy": heavy,
+            "ok": ms <= budget and not unexpected,
+        })
+    return records
+
+
+def print_imports(records):
+    print(f"{'module':<14} {'import_ms':>10} {'budget_ms':>10}  heavy")
+    for record in records:
+        flag = "" if record["ok"] else "  OVER BUDGET"
+        print(f"{record['module']:<14} {record['import_ms']:>10.2f} {record['budget_ms']:>10}  "
+              f"{','.join(record['heavy']) or '-'}{flag}")
+
+
+def main(args):
+    if args.imports:
+        records = check_imports()
+        print_imports(records)
+        if args.json:
+            import json
+
+            with open(args.json, "w") as output:
+                json.dump({"metadata": metadata(args.seed), "imports": records}, output, indent=2)
+        if not all(record["ok"] for record in records):
+            sys.exit(1)
+        return
+    records = run_benchmark(args.corpus, args.backends, args.seed, not args.no_memory)
+    print_summary(summarize(records))
+    if args.json:
+        write_json(args.json, records, args.seed)
+    if args.csv:
+        write_csv(args.csv, records)
@@ -0,0 +1,77 @@
+from context import get_context
+
+
+class BitBoard:
+    """Sudoku grid with per-row, per-column and per-box bitmasks of used digits.
+
+    Bit ``num - 1`` of a mask is set when ``num`` is used in that unit, so a
+    safety check is three lookups and the candidates of a cell are one AND.
+    The wrapped grid is updated in place by place() and unplace(). The
+    board geometry comes from context, by default the shared one for the
+    grid's size.
+    """
+
+    def __init__(self, grid, context=None):
+        self.grid = grid
+        self.context = context or get_context(len(grid))
+        self.size = self.context.size
+        self.box_size = self.context.box_size
+        self.box_of = self.context.box_of
+        self.full = (1 << self.size) - 1
+        self.rows = [0] * self.size
+        self.cols = [0] * self.size
+        self.boxes = [0] * self.size
+        self.valid = True  # False when the givens already break a constraint
+        for row in range(self.size):
+            for col in range(self.size):
+                num = grid[row][col]
+                if num != 0:
+                    if not self.is_safe(row, col, num):
+                        self.valid = False
+                    self._set(row, col, num)
+
+    def box_index(self, row, col):
+        return self.box_of[row][col]
+
+    def _set(self, row, col, num):
+        bit = 1 << (num - 1)
+        self.rows[row] |= bit
+        self.cols[col] |= bit
+        self.boxes[self.box_index(row, col)] |= bit
+
+    def _clear(self, row, col, num):
+        bit = ~(1 << (num - 1))
+        self.rows[row] &= bit
+        self.cols[col] &= bit
+        self.boxes[self.box_index(row, col)] &= bit
+
+    def used(self, row, col):
+        """Mask of the digits already used by the peers of (row, col)."""
+        return self.rows[row] | self.cols[col] | self.boxes[self.box_index(row, col)]
+
+    def candidates(self, row, col):
+        """Mask of the digits that can still be placed at (row, col)."""
+        return self.full & ~self.used(row, col)
+
+    def is_safe(self, row, col, num):
+        return not (self.used(row, col) >> (num - 1)) & 1
+
+    def place(self, row, col, num):
+        self.grid[row][col] = num
+        self._set(row, col, num)
+
+    def unplace(self, row, col):
+        num = self.grid[row][col]
+        if num != 0:
+            self._clear(row, col, num)
+            self.grid[row][col] = 0
+
+
+def mask_to_digits(mask):
+    """List the digits whose bits are set in mask, smallest first."""
+    digits = []
+    while mask:
+        low = mask & -mask
+        digits.append(low.bit_length())
+        mask ^= low
+    return digits
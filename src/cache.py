@@ -0,0 +1,211 @@
+import itertools
+import math
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from batch import ALPHABET
+from solver import SolveResult, solve
+
+
+def _grid_key(grid):
+    return "".join(ALPHABET[num - 1] if num else "." for row in grid for num in row)
+
+
+def _key_grid(key):
+    board_size = math.isqrt(len(key))
+    values = [ALPHABET.index(char) + 1 if char != "." else 0 for char in key]
+    return [values[row * board_size:(row + 1) * board_size] for row in range(board_size)]
+
+
+def _tie_orders(items, key):
+    """Yield orderings of items sorted by key, permuting runs of equal keys."""
+    ordered = sorted(items, key=key)
+    groups = [list(group) for _, group in itertools.groupby(ordered, key=key)]
+    for combo in itertools.product(*(itertools.permutations(group) for group in groups)):
+        yield [item for group in combo for item in group]
+
+
+def _axis_orders(line_keys, box_size):
+    """Yield row (or column) orders that keep bands (or stacks) together."""
+    bands = [list(range(band * box_size, (band + 1) * box_size)) for band in range(box_size)]
+    band_key = lambda band: sorted(line_keys[line] for line in bands[band])
+    for band_order in _tie_orders(range(box_size), band_key):
+        per_band = [list(_tie_orders(bands[band], line_keys.__getitem__)) for band in band_order]
+        for lines in itertools.product(*per_band):
+            yield [line for band in lines for line in band]
+
+
+def _line_keys(grid, transposed):
+    """Invariant keys for every row of grid (columns when transposed).
+
+    A key depends only on the clue pattern and digit frequencies, so it is
+    unchanged by digit relabeling and by permuting the other axis.
+    """
+    board_size = len(grid)
+    cell = (lambda line, i: grid[i][line]) if transposed else (lambda line, i: grid[line][i])
+    cross_counts = [sum(1 for i in range(board_size) if cell(i, other)) for other in range(board_size)]
+    frequency = [0] * (board_size + 1)
+    for row in grid:
+        for num in row:
+            frequency[num] += 1
+    keys = []
+    for line in range(board_size):
+        filled = [i for i in range(board_size) if cell(line, i)]
+        keys.append((
+            len(filled),
+            tuple(sorted(cross_counts[i] for i in filled)),
+            tuple(sorted(frequency[cell(line, i)] for i in filled)),
+        ))
+    return keys
+
+
+def canonical_form(grid, max_orders=16):
+    """Map grid to a canonical representative of its symmetry class.
+
+    The symmetries are transposition, band/stack and row/column permutations
+    and digit relabeling. Rows and columns are sorted by relabel-invariant
+    keys; lines with equal keys are tried in every order (at most
+    max_orders per axis), and the candidate with the smallest string after
+    relabeling digits by first appearance wins. Returns (key, transform).
+
+    Equivalent grids almost always get the same key; when the tie budget
+    runs out they may not, which only costs a cache miss.
+    """
+    board_size = len(grid)
+    box_size = math.isqrt(board_size)
+    best_key, best_transform = None, None
+    for transposed in (False, True):
+        source = [list(col) for col in zip(*grid)] if transposed else grid
+        row_orders = list(itertools.islice(_axis_orders(_line_keys(source, False), box_size), max_orders))
+        col_orders = list(itertools.islice(_axis_orders(_line_keys(source, True), box_size), max_orders))
+        for rows in row_orders:
+            for cols in col_orders:
+                labels = [0] * (board_size + 1)
+                next_label = 1
+                chars = []
+                for row in rows:
+                    source_row = source[row]
+                    for col in cols:
+                        num = source_row[col]
+                        if num and not labels[num]:
+                            labels[num] = next_label
+                            next_label += 1
+                        chars.append(ALPHABET[labels[num] - 1] if num else ".")
+                key = "".join(chars)
+                if best_key is None or key < best_key:
+                    # Digits missing from the grid take the remaining labels in order
+                    for num in range(1, board_size + 1):
+                        if not labels[num]:
+                            labels[num] = next_label
+                            next_label += 1
+                    best_key, best_transform = key, (transposed, rows, cols, labels)
+    return best_key, best_transform
+
+
+def from_canonical(canonical_grid, transform):
+    """Map a grid in the canonical frame back to the original frame."""
+    transposed, rows, cols, labels = transform
+    board_size = len(canonical_grid)
+    digits = [0] * (board_size + 1)
+    for num in range(1, board_size + 1):
+        digits[labels[num]] = num
+    source = [[0] * board_size for _ in range(board_size)]
+    for i, row in enumerate(rows):
+        for j, col in enumerate(cols):
+            source[row][col] = digits[canonical_grid[i][j]]
+    return [list(col) for col in zip(*source)] if transposed else source
+
+
+class SolutionCache:
+    """Bounded LRU of solutions keyed by canonical puzzle form.
+
+    Exact resubmissions are found by their raw key without canonicalizing.
+    If path is given, canonical entries are also kept in an SQLite file so
+    they survive restarts and can be shared between processes.
+    """
+
+    def __init__(self, maxsize=4096, path=None):
+        self.maxsize = maxsize
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()  # the GUI stores solutions from solver threads
+        self.db = None
+        if path is not None:
+            self.db = sqlite3.connect(path, timeout=30, check_same_thread=False)
+            self.db.execute("CREATE TABLE IF NOT EXISTS solutions (puzzle TEXT PRIMARY KEY, solution TEXT)")
+            self.db.commit()
+
+    def _remember(self, key, solution_key):
+        self.entries[key] = solution_key
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+
+    def _lookup(self, key):
+        solution_key = self.entries.get(key)
+        if solution_key is not None:
+            self.entries.move_to_end(key)
+        elif self.db is not None:
+            row = self.db.execute("SELECT solution FROM solutions WHERE puzzle = ?", (key,)).fetchone()
+            if row:
+                solution_key = row[0]
+                self._remember(key, solution_key)
+        return solution_key
+
+    def get(self, grid):
+        """Return the cached solution of grid in its own frame, or None."""
+        with self.lock:
+            return self._get(grid)
+
+    def _get(self, grid):
+        raw_key = "raw:" + _grid_key(grid)
+        solution_key = self.entries.get(raw_key)
+        if solution_key is not None:
+            self.entries.move_to_end(raw_key)
+            self.hits += 1
+            return _key_grid(solution_key)
+
+        key, transform = canonical_form(grid)
+        solution_key = self._lookup(key)
+        if solution_key is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        solution = from_canonical(_key_grid(solution_key), transform)
+        self._remember(raw_key, _grid_key(solution))
+        return solution
+
+    def put(self, grid, solution):
+        with self.lock:
+            self._put(grid, solution)
+
+    def _put(self, grid, solution):
+        key, transform = canonical_form(grid)
+        _, rows, cols, labels = transform
+        source = [list(col) for col in zip(*solution)] if transform[0] else solution
+        canonical_solution = [[labels[source[row][col]] for col in cols] for row in rows]
+        solution_key = _grid_key(canonical_solution)
+        self._remember(key, solution_key)
+        self._remember("raw:" + _grid_key(grid), _grid_key(solution))
+        if self.db is not None:
+            self.db.execute("INSERT OR REPLACE INTO solutions VALUES (?, ?)", (key, solution_key))
+            self.db.commit()
+
+    def solve(self, grid, board_size, method="dlx", **options):
+        """solver.solve() that answers repeat and symmetric puzzles from the cache."""
+        start = time.perf_counter()
+        solution = self.get(grid)
+        if solution is not None:
+            return SolveResult(solution, elapsed=time.perf_counter() - start)
+        result = solve(grid, board_size, method=method, **options)
+        if result.solved:
+            self.put(grid, result.grid)
+        return result
+
+    def close(self):
+        if self.db is not None:
+            self.db.close()
+            self.db = None
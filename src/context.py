@@ -0,0 +1,38 @@
+import functools
+
+from indices import get_indices
+
+
+class BoardContext:
+    """Geometry of one board size: box shape, units and peers.
+
+    The tables mirror the flat ones of indices.py with (row, col) cells;
+    the flat tables themselves are available as context.indices. A context
+    holds no puzzle state and is never modified after it is built, so
+    get_context() shares one per size between every solve in the process,
+    whatever their sizes and threads.
+    """
+
+    def __init__(self, size):
+        indices = get_indices(size)
+        self.indices = indices
+        self.size = size
+        self.box_size = indices.box_size
+        self.cells = tuple(zip(indices.row_of, indices.col_of))
+        self.box_of = tuple(indices.box_of[row * size:(row + 1) * size] for row in range(size))
+        # Units: rows [0, size), columns [size, 2 * size), boxes [2 * size, 3 * size)
+        self.units = tuple(tuple(self.cells[i] for i in unit) for unit in indices.units)
+        self.peers = {self.cells[i]: tuple(self.cells[p] for p in peers) for i, peers in enumerate(indices.peers)}
+
+    def box_index(self, row, col):
+        return self.box_of[row][col]
+
+    def box_origin(self, row, col):
+        """Top-left cell of the box holding (row, col)."""
+        return row - row % self.box_size, col - col % self.box_size
+
+
+@functools.lru_cache(maxsize=None)
+def get_context(size):
+    """Return the shared BoardContext for boards of the given size."""
+    return BoardContext(size)
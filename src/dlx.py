@@ -0,0 +1,201 @@
+from bitboard import BitBoard
+
+
+class DancingLinks:
+    """Knuth's Algorithm X over a sparse 0/1 matrix stored as dancing links.
+
+    Nodes live in parallel lists (left, right, up, down, column) instead of
+    objects; index 0 is the root and 1..column_count are column headers.
+    """
+
+    def __init__(self, column_count):
+        self.L = list(range(-1, column_count))
+        self.R = list(range(1, column_count + 2))
+        self.L[0] = column_count
+        self.R[column_count] = 0
+        self.U = list(range(column_count + 1))
+        self.D = list(range(column_count + 1))
+        self.C = list(range(column_count + 1))
+        self.S = [0] * (column_count + 1)
+        self.row_of = [None] * (column_count + 1)  # row id of every node
+
+    def add_row(self, row_id, columns):
+        """Append a row with a 1 in each of columns (0-based)."""
+        L, R, U, D, C, S = self.L, self.R, self.U, self.D, self.C, self.S
+        first = len(L)
+        for offset, column in enumerate(columns):
+            header = column + 1
+            node = first + offset
+            L.append(node - 1 if offset else first + len(columns) - 1)
+            R.append(node + 1 if offset < len(columns) - 1 else first)
+            U.append(U[header])
+            D.append(header)
+            C.append(header)
+            D[U[header]] = node
+            U[header] = node
+            S[header] += 1
+            self.row_of.append(row_id)
+        return first
+
+    def cover(self, column):
+        L, R, U, D, C, S = self.L, self.R, self.U, self.D, self.C, self.S
+        R[L[column]] = R[column]
+        L[R[column]] = L[column]
+        i = D[column]
+        while i != column:
+            j = R[i]
+            while j != i:
+                D[U[j]] = D[j]
+                U[D[j]] = U[j]
+                S[C[j]] -= 1
+                j = R[j]
+            i = D[i]
+
+    def uncover(self, column):
+        L, R, U, D, C, S = self.L, self.R, self.U, self.D, self.C, self.S
+        i = U[column]
+        while i != column:
+            j = L[i]
+            while j != i:
+                S[C[j]] += 1
+                D[U[j]] = j
+                U[D[j]] = j
+                j = L[j]
+            i = U[i]
+        R[L[column]] = column
+        L[R[column]] = column
+
+    def select(self, node):
+        """Commit to the row of node up front, e.g. for a given clue."""
+        self.cover(self.C[node])
+        j = self.R[node]
+        while j != node:
+            self.cover(self.C[j])
+            j = self.R[j]
+
+    def search(self, limit=1, max_nodes=None):
+        """Enumerate exact covers without recursion.
+
+        Returns (count, first, nodes): the number of covers found (stopping at
+        limit), the row ids of the first one (or None) and the number of rows
+        tried. The matrix is left in an undefined state afterwards.
+        """
+        L, R, D, C, S = self.L, self.R, self.D, self.C, self.S
+        cover, uncover = self.cover, self.uncover
+        chosen = []  # one node per level of the search
+        count = 0
+        first = None
+        nodes = 0
+
+        while True:
+            if R[0] == 0:
+                count += 1
+                if first is None:
+                    first = [self.row_of[node] for node in chosen]
+                if count >= limit:
+                    break
+            else:
+                # Choose the column with the fewest remaining rows
+                column = R[0]
+                best = S[column]
+                j = R[column]
+                while j != 0 and best > 1:
+                    if S[j] < best:
+                        column, best = j, S[j]
+                    j = R[j]
+                if best:
+                    cover(column)
+                    node = D[column]
+                    chosen.append(node)
+                    j = R[node]
+                    while j != node:
+                        cover(C[j])
+                        j = R[j]
+                    nodes += 1
+                    if max_nodes is not None and nodes >= max_nodes:
+                        break
+                    continue
+
+            # Backtrack to the deepest level that still has an untried row
+            while chosen:
+                node = chosen.pop()
+                j = L[node]
+                while j != node:
+                    uncover(C[j])
+                    j = L[j]
+                column = C[node]
+                node = D[node]
+                if node != column:
+                    chosen.append(node)
+                    j = R[node]
+                    while j != node:
+                        cover(C[j])
+                        j = R[j]
+                    nodes += 1
+                    break
+                uncover(column)
+            else:
+                break
+            if max_nodes is not None and nodes >= max_nodes:
+                break
+
+        return count, first, nodes
+
+
+def sudoku_matrix(grid):
+    """Build the exact-cover matrix of a Sudoku of any square box size.
+
+    Columns are the cell, row-digit, column-digit and box-digit constraints.
+    Returns None when the givens already conflict.
+    """
+    board = BitBoard(grid)
+    if not board.valid:
+        return None
+    n = board.size
+    cells = n * n
+    links = DancingLinks(4 * cells)
+    givens = []
+    for row in range(n):
+        for col in range(n):
+            box = board.box_index(row, col)
+            num = grid[row][col]
+            mask = 1 << (num - 1) if num else board.candidates(row, col)
+            while mask:
+                bit = mask & -mask
+                mask ^= bit
+                digit = bit.bit_length() - 1
+                node = links.add_row(
+                    (row, col, digit + 1),
+                    (
+                        row * n + col,
+                        cells + row * n + digit,
+                        2 * cells + col * n + digit,
+                        3 * cells + box * n + digit,
+                    ),
+                )
+                if num:
+                    givens.append(node)
+    for node in givens:
+        links.select(node)
+    return links
+
+
+def solve_dlx(grid, limit=1, max_nodes=None):
+    """Return (count, solution, nodes) for grid; solution is a new grid or None."""
+    links = sudoku_matrix(grid)
+    if links is None:
+        return 0, None, 0
+    count, rows, nodes = links.search(limit, max_nodes)
+    if rows is None:
+        return count, None, nodes
+    solution = [row[:] for row in grid]
+    for row, col, num in rows:
+        solution[row][col] = num
+    return count, solution, nodes
+
+
+def count_solutions(grid, board_size, limit=2):
+    """Count the solutions of grid, stopping once limit have been found."""
+    if len(grid) != board_size:
+        raise ValueError(f"Expected a {board_size}x{board_size} grid")
+    return solve_dlx(grid, limit)[0]
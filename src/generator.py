@@ -0,0 +1,138 @@
+import random
+import time
+
+from bitboard import BitBoard
+from dlx import solve_dlx
+from solver import propagate, solve, unit_cells
+
+# Difficulty levels, rated by the MRV search in solver.py: "easy" puzzles
+# fall to naked and hidden singles alone, the others need guessing and are
+# told apart by how many guesses the search makes (see hard_nodes()).
+DIFFICULTIES = ["easy", "medium", "hard"]
+# DLX nodes per cell allowed for one uniqueness check while digging
+DIG_NODES_PER_CELL = 4
+
+
+def hard_nodes(board_size):
+    """MRV guesses from which a puzzle of this size rates "hard".
+
+    Scaled from 3 at 9x9 so the split stays near the median of non-easy
+    digs at every size (about 20 guesses at 16x16).
+    """
+    return max(1, round(3 * (board_size * board_size / 81) ** 1.6))
+
+
+def full_grid(board_size, rng):
+    """Return a random completely filled grid."""
+    box_size = int(board_size ** 0.5)
+    while True:
+        # The diagonal boxes share no unit, so any fill of them is consistent
+        grid = [[0] * board_size for _ in range(board_size)]
+        for box in range(box_size):
+            numbers = rng.sample(range(1, board_size + 1), board_size)
+            for i in range(box_size):
+                for j in range(box_size):
+                    grid[box * box_size + i][box * box_size + j] = numbers[i * box_size + j]
+        count, solution, _ = solve_dlx(grid)
+        if count:
+            return solution
+
+
+def solves_with_singles(grid):
+    """True when naked and hidden singles alone complete the grid."""
+    board = BitBoard([row[:] for row in grid])
+    return propagate(board, unit_cells(board.size), []) and all(all(row) for row in board.grid)
+
+
+def rate(grid):
+    """Rate a puzzle with a unique solution as one of DIFFICULTIES."""
+    if solves_with_singles(grid):
+        return "easy"
+    nodes = solve(grid, len(grid), method="mrv").nodes
+    return "hard" if nodes >= hard_nodes(len(grid)) else "medium"
+
+
+def is_unique(grid):
+    """True when grid provably has exactly one solution.
+
+    Singles completing the grid prove it cheaply; otherwise DLX counts up
+    to two solutions within DIG_NODES_PER_CELL nodes per cell. A count cut
+    short by that budget proves nothing, so it answers False.
+    """
+    if solves_with_singles(grid):
+        return True
+    budget = DIG_NODES_PER_CELL * len(grid) * len(grid)
+    count, _, nodes = solve_dlx(grid, 2, budget)
+    return count == 1 and nodes < budget
+
+
+def dig(solution, rng, easy=False):
+    """Remove clues from a full grid while the solution stays unique.
+
+    Cells are removed in point-symmetric pairs. With easy=True a removal is
+    kept only if singles still solve the grid, which also proves uniqueness
+    without counting solutions; otherwise only if is_unique() holds, which
+    keeps every check bounded on large boards.
+    """
+    board_size = len(solution)
+    grid = [row[:] for row in solution]
+    cells = [(row, col) for row in range(board_size) for col in range(board_size)]
+    rng.shuffle(cells)
+    for row, col in cells:
+        mirror_row, mirror_col = board_size - 1 - row, board_size - 1 - col
+        if grid[row][col] == 0:
+            continue
+        removed = [(row, col, grid[row][col]), (mirror_row, mirror_col, grid[mirror_row][mirror_col])]
+        for r, c, _ in removed:
+            grid[r][c] = 0
+        keep = solves_with_singles(grid) if easy else is_unique(grid)
+        if not keep:
+            for r, c, num in removed:
+                grid[r][c] = num
+    return grid
+
+
+def generate_puzzle(board_size=9, difficulty="easy", seed=None, max_attempts=50, time_limit=10.0):
+    """Generate a puzzle with a unique solution, aiming for difficulty.
+
+    Returns (puzzle, rating); the rating can fall short of the target when
+    max_attempts grids, or those dug within time_limit seconds (at least
+    one), all rate differently.
+    """
+    if difficulty not in DIFFICULTIES:
+        raise ValueError(f"Unknown difficulty: {difficulty}")
+    rng = random.Random(seed)
+    target = DIFFICULTIES.index(difficulty)
+    deadline = None if time_limit is None else time.monotonic() + time_limit
+    best = None
+    for _ in range(max_attempts):
+        if best is not None and deadline is not None and time.monotonic() >= deadline:
+            break
+        puzzle = dig(full_grid(board_size, rng), rng, easy=difficulty == "easy")
+        rating = rate(puzzle)
+        if rating == difficulty:
+            return puzzle, rating
+        if best is None or abs(DIFFICULTIES.index(rating) - target) < abs(DIFFICULTIES.index(best[1]) - target):
+            best = (puzzle, rating)
+    return best
+
+
+def _generate_task(args):
+    return generate_puzzle(*args)
+
+
+def generate_many(count, board_size=9, difficulty="easy", seed=None, workers=1):
+    """Yield count (puzzle, rating) pairs, generated in parallel when workers > 1.
+
+    Puzzle i is generated from its own seed derived from seed, so the output
+    is the same for any number of workers.
+    """
+    seeds = random.Random(seed).sample(range(1 << 62), count)
+    tasks = [(board_size, difficulty, task_seed) for task_seed in seeds]
+    if workers <= 1:
+        yield from map(_generate_task, tasks)
+        return
+    from concurrent.futures import ProcessPoolExecutor  # imported lazily: pulls in logging
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        yield from pool.map(_generate_task, tasks, chunksize=max(1, count // (workers * 4)))
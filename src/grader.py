@@ -0,0 +1,111 @@
+import functools
+import sys
+import time
+from collections import namedtuple
+
+import numpy as np
+
+from indices import get_indices
+
+# Per-grid results of grade(): boolean arrays of shape (N,), except
+# conflicts, which is (N, n, n) and marks every filled cell whose value
+# repeats in its row, column or box.
+Grade = namedtuple("Grade", ["valid", "complete", "solved", "keeps_givens", "conflicts"])
+
+CHUNK_SIZE = 4096  # grids graded at a time: small enough for the temporaries to stay in cache
+
+
+@functools.lru_cache(maxsize=None)
+def _tables(size):
+    """Unit cells as a (3n, n) array, each cell's three units as an (n * n, 3)
+    array, and the bit of each value 0..n (digit d is bit d - 1, a blank 0)."""
+    indices = get_indices(size)
+    dtype = np.uint16 if size <= 16 else np.uint32
+    digit_bits = np.array([0] + [1 << digit for digit in range(size)], dtype=dtype)
+    return np.asarray(indices.units, dtype=np.intp), np.asarray(indices.cell_units, dtype=np.intp), digit_bits
+
+
+def _grade_chunk(grids):
+    count, size, _ = grids.shape
+    flat = grids.reshape(count, size * size)
+    in_range = (flat >= 0) & (flat <= size)
+    units, cell_units, digit_bits = _tables(size)
+    bits = digit_bits[np.where(in_range, flat, 0)]  # out-of-range values count as blanks here
+    once = np.zeros((count, 3 * size), dtype=digit_bits.dtype)
+    twice = np.zeros_like(once)  # digits seen at least twice in each unit
+    for position in range(size):
+        cell_bits = bits[:, units[:, position]]
+        twice |= once & cell_bits
+        once |= cell_bits
+
+    repeated = twice[:, cell_units[:, 0]] | twice[:, cell_units[:, 1]] | twice[:, cell_units[:, 2]]
+    conflicts = (repeated & bits) != 0
+    valid = ~twice.any(axis=1) & in_range.all(axis=1)
+    complete = (flat != 0).all(axis=1)
+    return valid, complete, conflicts.reshape(count, size, size)
+
+
+def grade(grids, puzzles=None, chunk_size=CHUNK_SIZE):
+    """Validate and grade a batch of grids in vectorized passes; returns a Grade.
+
+    grids is an (N, n, n) array (or a single (n, n) grid, graded as N = 1)
+    of puzzles or solutions, 0 for blank cells. A grid is valid when no
+    filled value repeats in a unit and every value lies in 0..n, complete
+    when it has no blanks, and solved when it is both and keeps the givens
+    of the matching grid in puzzles, if given.
+    """
+    grids = np.asarray(grids)
+    if grids.ndim == 2:
+        grids = grids[None]
+    if grids.ndim != 3 or grids.shape[1] != grids.shape[2]:
+        raise ValueError(f"Expected an (N, n, n) array of grids, got shape {grids.shape}")
+    get_indices(grids.shape[1])  # rejects sizes that are not perfect squares
+
+    if grids.shape[0] == 0:
+        empty = np.zeros(0, dtype=bool)
+        return Grade(empty, empty, empty, empty, np.zeros(grids.shape, dtype=bool))
+    parts = [_grade_chunk(grids[start:start + chunk_size]) for start in range(0, len(grids), chunk_size)]
+    valid, complete, conflicts = (np.concatenate(arrays) for arrays in zip(*parts))
+
+    keeps_givens = np.ones(len(grids), dtype=bool)
+    if puzzles is not None:
+        puzzles = np.asarray(puzzles).reshape(grids.shape)
+        keeps_givens = ((puzzles == 0) | (puzzles == grids)).all(axis=(1, 2))
+    return Grade(valid, complete, valid & complete & keeps_givens, keeps_givens, conflicts)
+
+
+def first_conflict(grade_result, index=0):
+    """Return (row, col) of the first conflicting cell of grid index, or None."""
+    cells = np.argwhere(grade_result.conflicts[index])
+    return tuple(int(x) for x in cells[0]) if len(cells) else None
+
+
+def main(args):
+    """Grade puzzle lines (the batch format, one board size per input) and print one verdict per line."""
+    from batch import parse_puzzle
+
+    source = sys.stdin if args.input == "-" else open(args.input)
+    try:
+        grids = np.array([parse_puzzle(line) for line in source if line.strip()], dtype=np.uint8)
+    except ValueError as error:
+        sys.exit(f"error: {error}")
+    finally:
+        if source is not sys.stdin:
+            source.close()
+
+    start = time.perf_counter()
+    result = grade(grids)
+    elapsed = time.perf_counter() - start
+    for index in range(len(grids)):
+        if result.solved[index]:
+            print("solved")
+        elif result.valid[index]:
+            print("valid")
+        else:
+            cells = np.argwhere(result.conflicts[index])
+            print("invalid\t" + " ".join(f"r{row + 1}c{col + 1}" for row, col in cells))
+    print(
+        f"Graded {len(grids)} grids in {elapsed:.3f}s: {int(result.solved.sum())} solved, "
+        f"{int(result.valid.sum() - result.solved.sum())} valid, {int((~result.valid).sum())} invalid",
+        file=sys.stderr,
+    )
@@ -1,15 +1,38 @@
 import math
+import os
 import threading
 import tkinter as tk
 from tkinter import messagebox
 
-from puzzle import generate_random_sudoku, get_hint
-from utils import check_location_is_safe
-from Generic import genetic_algorithm, fitness
-import puzzle
-import utils
+from puzzle import generate_random_sudoku
+from hints import HintEngine
+from render import BoardRenderer
 import backtracking
-import Generic
+import solver
+from cache import SolutionCache
+from instrument import Instrumentation
+
+# Solver backends offered by the toggle button, in the order it cycles through them
+SOLVERS = [
+    ("backtracking", "Original"),
+    ("genetic", "Genetic"),
+    ("hybrid", "Hybrid GA"),
+    ("island", "Island GA"),
+    ("dlx", "Dancing Links"),
+    ("portfolio", "Portfolio"),
+]
+
+# Portfolio solves race every backend for at most this many seconds and
+# append the winner to this file, next to this module whatever the working
+# directory, so the default backend can be tuned
+PORTFOLIO_DEADLINE = 30.0
+PORTFOLIO_LOG = os.path.join(os.path.dirname(os.path.abspath(__file__)), "portfolio_wins.jsonl")
+
+# Solutions of puzzles solved in this session, shared by every board size
+solution_cache = SolutionCache()
+
+# Maximum redraws per second while a solver reports progress
+RENDER_FPS = 30
 
 def create_board_entries(frame, board_size):
     """Create a grid of Tkinter entries for Sudoku."""
@@ -38,13 +61,7 @@ def show_board_size_selection_window(root, frame):
         widget.destroy()
 
     def set_board_size(size):
-        global board_size
-        board_size = size
-        puzzle.board_size = size
-        utils.board_size = size
-        backtracking.board_size = size
-        Generic.board_size = size
-        create_gui(root, frame)  # Create the Sudoku GUI
+        create_gui(root, frame, size)  # Create the Sudoku GUI
 
     label = tk.Label(frame, text="Select Sudoku Board Size", font=("Arial", 14))
     label.pack(pady=10)
@@ -58,126 +75,234 @@ def show_board_size_selection_window(root, frame):
     button_16x16 = tk.Button(frame, text="16x16", font=("Arial", 12), command=lambda: set_board_size(16))
     button_16x16.pack(pady=5)
 
-def create_gui(root, frame):
-    """Main Sudoku GUI."""
+def create_gui(root, frame, board_size):
+    """Main Sudoku GUI for a board_size x board_size board."""
     for widget in frame.winfo_children():
         widget.destroy()
 
     def update_gui(arr):
-        """Update the GUI with the current board state."""
-        for i in range(board_size):
-            for j in range(board_size):
-                entries[i][j].delete(0, tk.END)
-                if arr[i][j] != 0:
-                    entries[i][j].insert(tk.END, arr[i][j])
-        root.update_idletasks()
+        """Queue the current board state for the next frame (safe from any thread)."""
+        renderer.submit(arr)
+        hint_state["engine"] = None
+
+    def show_grid(arr):
+        """Draw a board state immediately."""
+        renderer.draw(arr)
+        hint_state["engine"] = None
+
+    def read_cell(i, j):
+        """Value typed in a cell, 0 if it is empty or invalid."""
+        try:
+            value = int(entries[i][j].get())
+            return value if 1 <= value <= board_size else 0
+        except ValueError:
+            return 0
 
     def solve_and_display():
         """Solve the Sudoku and display the solution."""
-        grid = []
-        for i in range(board_size):
-            row = []
-            for j in range(board_size):
-                try:
-                    value = int(entries[i][j].get())
-                    row.append(value if 1 <= value <= board_size else 0)
-                except ValueError:
-                    row.append(0)
-            grid.append(row)
+        grid = [[read_cell(i, j) for j in range(board_size)] for i in range(board_size)]
 
-        Generic.INITIAL_SUDOKU = [row.copy() for row in grid]
+        initial_grid = [row.copy() for row in grid]
 
-        for i in range(board_size):
-            for j in range(board_size):
-                if grid[i][j] != 0:
-                    num = grid[i][j]
-                    grid[i][j] = 0
-                    if not check_location_is_safe(grid, i, j, num):
-                        messagebox.showerror(
-                            "Invalid Input",
-                            f"Number {num} at row {i + 1}, column {j + 1} violates Sudoku rules.",
-                        )
-                        return
-                    grid[i][j] = num
-
-        def run_genetic_solver():
-            solution = genetic_algorithm(
-                Generic.INITIAL_SUDOKU,
-                progress_callback=lambda grid: update_gui(grid),
+        from grader import first_conflict, grade  # imported lazily: pulls in NumPy
+
+        conflict = first_conflict(grade(grid))
+        if conflict is not None:
+            i, j = conflict
+            messagebox.showerror(
+                "Invalid Input",
+                f"Number {grid[i][j]} at row {i + 1}, column {j + 1} violates Sudoku rules.",
             )
-            if fitness(solution) == 0:
-                update_gui(solution)
-                messagebox.showinfo("Success", "Sudoku Solved using Genetic Algorithm!")
-            else:
-                messagebox.showerror("Error", "Failed to solve the Sudoku.")
+            return
+
+        renderer.invalidate()  # the user may have typed since the last frame
+        cached = solution_cache.get(grid)
+        if cached is not None:
+            show_grid(cached)
+            messagebox.showinfo("Success", "Sudoku Solved from the solution cache!")
+            return
+
+        if session_state["session"] is not None:
+            session_state["session"].cancel()  # a new solve replaces the running one
+        puzzle_grid = [row.copy() for row in grid]
+
+        def start_backtracking(session):
+            def on_finish(status):
+                if status == "solved":
+                    show_grid(session.grid)
+                    solution_cache.put(puzzle_grid, [row.copy() for row in session.grid])
+                    backtracking.plot_statistics(session.instrumentation)
+                end_session(session, status)
+
+            session.run_tk(root, update_gui, on_finish)
+
+        def start_genetic(session):
+            def on_finish(status):
+                if status == "solved":
+                    solution_cache.put(puzzle_grid, session.grid)
+                    show_grid(session.grid)
+                    messagebox.showinfo("Success", "Sudoku Solved using Genetic Algorithm!")
+                elif status == "failed":
+                    messagebox.showerror("Error", "Failed to solve the Sudoku.")
+                end_session(session, status)
+
+            def run_genetic_solver():
+                status = session.run(progress_callback=update_gui)
+                root.after(0, on_finish, status)  # Tk and the cache belong to the main thread
 
-        if use_generic_solver.get():
             threading.Thread(target=run_genetic_solver, daemon=True).start()
+
+        if solver_choice.get() == "genetic":
+            from session import GeneticSession  # imported lazily: pulls in NumPy
+
+            session = GeneticSession(initial_grid)
+            session_state.update(session=session, start=start_genetic)
+            start_genetic(session)
+        elif solver_choice.get() in ("hybrid", "island"):
+            method = solver_choice.get()
+            name = "Hybrid Genetic Algorithm" if method == "hybrid" else "Island Genetic Algorithm"
+            # The hybrid falls back to an exact search, so its failures are proofs
+            failure = "This Sudoku has no solution." if method == "hybrid" else "No solution found within the generations."
+
+            def show_hybrid_result(result):
+                if result.solved:
+                    solution_cache.put(puzzle_grid, result.grid)
+                    show_grid(result.grid)
+                    messagebox.showinfo("Success", f"Sudoku Solved using the {name}!")
+                else:
+                    messagebox.showerror("Error", failure)
+
+            def run_hybrid_solver():
+                result = solver.solve(grid, board_size, method=method, progress_callback=lambda arr, _: update_gui(arr))
+                root.after(0, show_hybrid_result, result)
+
+            threading.Thread(target=run_hybrid_solver, daemon=True).start()
+        elif solver_choice.get() == "portfolio":
+            from portfolio import solve_portfolio
+
+            def show_portfolio_result(result):
+                if result.solved:
+                    solution_cache.put(puzzle_grid, result.grid)
+                    show_grid(result.grid)
+                    messagebox.showinfo("Success", f"Sudoku Solved by the portfolio ({result.winner} won)!")
+                else:
+                    messagebox.showerror("Error", "No backend solved this Sudoku within the deadline.")
+
+            def run_portfolio_solver():
+                result = solve_portfolio(grid, deadline=PORTFOLIO_DEADLINE, log_path=PORTFOLIO_LOG)
+                root.after(0, show_portfolio_result, result)
+
+            threading.Thread(target=run_portfolio_solver, daemon=True).start()
+        elif solver_choice.get() == "dlx":
+            result = solver.solve(grid, board_size, method="dlx")
+            if result.solved:
+                solution_cache.put(grid, result.grid)
+                show_grid(result.grid)
+                messagebox.showinfo("Success", "Sudoku Solved using Dancing Links!")
+            else:
+                messagebox.showerror("Error", "This Sudoku has no solution.")
+        else:
+            from session import BacktrackingSession
+
+            session = BacktrackingSession(grid, instrumentation=Instrumentation("backtracking"))
+            session_state.update(session=session, start=start_backtracking)
+            start_backtracking(session)
+
+    def end_session(session, status):
+        """Forget a session that has stopped for good; paused ones can resume."""
+        if status != "paused" and session_state["session"] is session:
+            session_state["session"] = None
+            pause_button.config(text="Pause")
+
+    def toggle_pause():
+        """Pause the running solver, or resume the paused one."""
+        session = session_state["session"]
+        if session is None:
+            return
+        if session.pause_requested:
+            pause_button.config(text="Pause")
+            if session.resume():
+                session_state["start"](session)
         else:
-            empty_cells = [(row, col) for row in range(board_size) for col in range(board_size) if grid[row][col] == 0]
-            SL = []
-            NSL = [(empty_cells[0], 0, [])]
-            DE = []
-            backtracking.solve_sudoku_async(grid, empty_cells, SL, NSL, DE, update_gui, root)
+            session.pause()
+            pause_button.config(text="Resume")
+
+    def cancel_solver():
+        """Stop the running or paused solver for good."""
+        session = session_state["session"]
+        if session is not None:
+            session.cancel()
+            if session.done:
+                end_session(session, session.status)
 
     def generate_random_and_display():
         """Generate and display a random Sudoku puzzle."""
-        grid = generate_random_sudoku()
+        grid = generate_random_sudoku(board_size)
         for i in range(board_size):
             for j in range(board_size):
                 entries[i][j].delete(0, tk.END)
                 if grid[i][j] != 0:
                     entries[i][j].insert(tk.END, grid[i][j])
+        renderer.invalidate()
+        hint_state["engine"] = None
 
     def reset_grid():
         """Reset the grid to an empty state."""
         for i in range(board_size):
             for j in range(board_size):
                 entries[i][j].delete(0, tk.END)
+        renderer.invalidate()
+        hint_state["engine"] = None
+
+    def on_cell_edit(i, j):
+        """Keep the hint engine in step with what the user types."""
+        if hint_state["engine"] is not None:
+            hint_state["engine"].set_cell(i, j, read_cell(i, j))
 
     def hint_and_display():
         """Provide a hint for the next move."""
-        grid = []
-        for i in range(board_size):
-            row = []
-            for j in range(board_size):
-                try:
-                    value = int(entries[i][j].get())
-                    row.append(value if 1 <= value <= board_size else 0)
-                except ValueError:
-                    row.append(0)
-            grid.append(row)
-
-        hint = get_hint(grid)
+        if hint_state["engine"] is None:
+            grid = [[read_cell(i, j) for j in range(board_size)] for i in range(board_size)]
+            hint_state["engine"] = HintEngine(grid)
+
+        hint = hint_state["engine"].next_hint()
         if hint:
-            row, col, num = hint
-            messagebox.showinfo("Hint", f"Try placing {num} at row {row + 1}, column {col + 1}.")
+            row, col, num, technique = hint
+            messagebox.showinfo("Hint", f"Try placing {num} at row {row + 1}, column {col + 1} ({technique}).")
         else:
-            messagebox.showinfo("Hint", "No empty cells to hint.")
+            messagebox.showinfo("Hint", "No hint available: the grid is full or has no solution.")
 
     entries = create_board_entries(frame, board_size)
+    renderer = BoardRenderer(root, entries, RENDER_FPS)
+    hint_state = {"engine": None}  # built on the first hint, then updated per edit
+    session_state = {"session": None, "start": None}  # the solver run that Pause and Cancel act on
+    for i in range(board_size):
+        for j in range(board_size):
+            entries[i][j].bind("<KeyRelease>", lambda event, i=i, j=j: on_cell_edit(i, j))
 
     button_frame = tk.Frame(frame)
     button_frame.grid(row=board_size, column=0, columnspan=board_size, pady=10)
 
-    use_generic_solver = tk.BooleanVar()
-    use_generic_solver.set(False)
+    solver_choice = tk.StringVar()
+    solver_choice.set(SOLVERS[0][0])
+
+    def next_solver():
+        names = [name for name, _ in SOLVERS]
+        return SOLVERS[(names.index(solver_choice.get()) + 1) % len(SOLVERS)]
 
     def toggle_solver():
-        use_generic_solver.set(not use_generic_solver.get())
-        toggle_solver_button.config(
-            text="Switch to Original Solver" if use_generic_solver.get() else "Switch to Genetic Solver"
-        )
+        solver_choice.set(next_solver()[0])
+        toggle_solver_button.config(text=f"Switch to {next_solver()[1]} Solver")
 
     toggle_solver_button = tk.Button(
         button_frame,
-        text="Switch to Genetic Solver",
+        text=f"Switch to {SOLVERS[1][1]} Solver",
         font=("Arial", 14),
         command=toggle_solver,
         bg="lightblue",
         activebackground="blue",
         relief="raised",
-        width=22,
+        width=26,
     )
     toggle_solver_button.grid(row=0, column=0, padx=5)
 
@@ -229,11 +354,40 @@ def create_gui(root, frame):
     )
     hint_button.grid(row=2, column=0, columnspan=3, pady=10)
 
-# Main execution
-root = tk.Tk()
-root.title("Sudoku Solver")
-main_frame = tk.Frame(root)
-main_frame.pack(pady=20, padx=20)
+    pause_button = tk.Button(
+        button_frame,
+        text="Pause",
+        font=("Arial", 14),
+        command=toggle_pause,
+        bg="lightgrey",
+        activebackground="grey",
+        relief="raised",
+        width=12,
+    )
+    pause_button.grid(row=3, column=0, padx=5)
+
+    cancel_button = tk.Button(
+        button_frame,
+        text="Cancel",
+        font=("Arial", 14),
+        command=cancel_solver,
+        bg="lightgrey",
+        activebackground="grey",
+        relief="raised",
+        width=12,
+    )
+    cancel_button.grid(row=3, column=1, padx=5)
 
-show_board_size_selection_window(root, main_frame)
-root.mainloop()
+def run_gui():
+    """Open the main window and run the Tk event loop."""
+    root = tk.Tk()
+    root.title("Sudoku Solver")
+    main_frame = tk.Frame(root)
+    main_frame.pack(pady=20, padx=20)
+
+    show_board_size_selection_window(root, main_frame)
+    root.mainloop()
+
+# Main execution
+if __name__ == "__main__":
+    run_gui()
@@ -0,0 +1,284 @@
+import functools
+from collections import namedtuple
+
+from bitboard import BitBoard
+from context import get_context
+from solver import most_constrained_cell, solve
+
+Hint = namedtuple("Hint", ["row", "col", "num", "technique"])
+
+# Masks over unit positions (the index of a cell in context.units[i]):
+# slots[cell] is the (unit, position) of the cell in its row, column and
+# box; row_mask[p] and col_mask[p] are the positions of a box on the same
+# row and column as its position p; segment[p] the positions of a row or
+# column that lie in the same box as its position p.
+Geometry = namedtuple("Geometry", ["slots", "row_mask", "col_mask", "segment"])
+
+
+@functools.lru_cache(maxsize=None)
+def _geometry(size):
+    context = get_context(size)
+    box_size = context.box_size
+    slots = {cell: [] for cell in context.cells}
+    for index, unit in enumerate(context.units):
+        for position, cell in enumerate(unit):
+            slots[cell].append((index, position))
+    first_box = context.units[2 * size]
+    return Geometry(
+        {cell: tuple(units) for cell, units in slots.items()},
+        tuple(sum(1 << q for q, other in enumerate(first_box) if other[0] == cell[0]) for cell in first_box),
+        tuple(sum(1 << q for q, other in enumerate(first_box) if other[1] == cell[1]) for cell in first_box),
+        tuple(((1 << box_size) - 1) << (p - p % box_size) for p in range(size)),
+    )
+
+
+class HintEngine:
+    """Find the cheapest logically forced move of a grid being edited.
+
+    The candidate mask of every empty cell, the set of naked singles and,
+    per unit and digit, a mask of the unit positions that still allow the
+    digit are kept up to date by set_cell() as the user types, touching
+    only the edited cell and its peers, so a hint never rescans the grid
+    for them. Singles are tried first; pointing/claiming and naked pair
+    eliminations are only applied when no single is left. A solution read
+    for a "Search" hint is kept for later hints until an edit contradicts it.
+    """
+
+    def __init__(self, grid):
+        self.load(grid)
+
+    def load(self, grid):
+        """Start over from a whole grid."""
+        self.board = BitBoard([row[:] for row in grid])
+        self.size = self.board.size
+        self.units = self.board.context.units
+        self.peers = self.board.context.peers
+        self.geometry = _geometry(self.size)
+        self.candidates = {}
+        self.singles = set()  # empty cells with at most one candidate
+        self.places = [[0] * self.size for _ in self.units]  # places[unit][digit - 1]: positions allowing digit
+        self.solution = None
+        for row in range(self.size):
+            for col in range(self.size):
+                if self.board.grid[row][col] == 0:
+                    self._refresh((row, col))
+
+    def _set_mask(self, candidates, places, singles, cell, mask):
+        """Give cell a new candidate mask (None once it is filled) in the given tables."""
+        changed = candidates.get(cell, 0) ^ (mask or 0)
+        if mask is None:
+            candidates.pop(cell, None)
+            singles.discard(cell)
+        else:
+            candidates[cell] = mask
+            if mask & (mask - 1) == 0:
+                singles.add(cell)
+            else:
+                singles.discard(cell)
+        slots = self.geometry.slots[cell]
+        while changed:
+            low = changed & -changed
+            digit = low.bit_length() - 1
+            for unit, position in slots:
+                places[unit][digit] ^= 1 << position
+            changed ^= low
+
+    def _refresh(self, cell):
+        self._set_mask(self.candidates, self.places, self.singles, cell, self.board.candidates(*cell))
+
+    def set_cell(self, row, col, num):
+        """Record an edit of one cell (num 0 clears it)."""
+        grid = self.board.grid
+        cell = (row, col)
+        if grid[row][col] == num:
+            return
+        if num and self.solution is not None and self.solution[row][col] != num:
+            self.solution = None
+        if self.board.valid:
+            self.board.unplace(row, col)
+            if num == 0 or self.board.is_safe(row, col, num):
+                if num:
+                    self.board.place(row, col, num)
+                    self._set_mask(self.candidates, self.places, self.singles, cell, None)
+                else:
+                    self._refresh(cell)
+                for peer in self.peers[cell]:
+                    if peer in self.candidates:
+                        self._refresh(peer)
+                return
+        # Conflicting values make the masks ambiguous: rebuild them
+        edited = [line[:] for line in grid]
+        edited[row][col] = num
+        self.load(edited)
+
+    def _unit_name(self, index):
+        kind = ("row", "column", "box")[index // self.size]
+        return f"{kind} {index % self.size + 1}"
+
+    def _single(self, candidates, places, singles, units=None):
+        """Return a Hint for a naked or hidden single, False on a contradiction, else None.
+
+        Hidden singles are only looked for in units, if given.
+        """
+        if singles:
+            if not all(candidates[cell] for cell in singles):
+                return False
+            row, col = min(singles)
+            mask = candidates[(row, col)]
+            return Hint(row, col, mask.bit_length(), "Naked Single")
+        # Boxes first: hidden singles in a box are the easiest to spot
+        order = list(range(2 * self.size, 3 * self.size)) + list(range(2 * self.size))
+        for index in order:
+            if units is not None and index not in units:
+                continue
+            found = None  # (position, digit) of the first cell holding a hidden single
+            for digit, where in enumerate(places[index]):
+                if where and where & (where - 1) == 0:
+                    position = where.bit_length() - 1
+                    if found is None or position < found[0]:
+                        found = (position, digit)
+            if found is not None:
+                row, col = self.units[index][found[0]]
+                return Hint(row, col, found[1] + 1, f"Hidden Single in {self._unit_name(index)}")
+        return None
+
+    def _eliminate(self, candidates, places, singles, pending, touched):
+        """Apply one elimination; returns the technique name or None.
+
+        pending holds the checks that may succeed: "pointing" and "claiming"
+        digit masks per box and per line, and the "pairs" units to scan for
+        naked pairs. A check that fails is dropped from it, and put back
+        when an elimination shrinks the places it depends on, so repeated
+        rounds only redo what the previous ones can have enabled. The units
+        of every cell that loses candidates are added to touched.
+        """
+        size = self.size
+        box_size = self.board.box_size
+        slots = self.geometry.slots
+        row_mask, col_mask, segment = self.geometry.row_mask, self.geometry.col_mask, self.geometry.segment
+        pointing, claiming, pair_units = pending["pointing"], pending["claiming"], pending["pairs"]
+
+        def remove(index, where, mask):
+            """Drop mask from the cells at the positions where of unit index."""
+            unit = self.units[index]
+            while where:
+                low = where & -where
+                cell = unit[low.bit_length() - 1]
+                removed = candidates[cell] & mask
+                remaining = candidates[cell] & ~mask
+                self._set_mask(candidates, places, singles, cell, remaining)
+                (row, _), (col, _), (box, _) = slots[cell]
+                pointing[box - 2 * size] |= removed
+                claiming[row] |= removed
+                claiming[col] |= removed
+                touched.update((row, col, box))
+                if remaining.bit_count() == 2:
+                    pair_units.update((row, col, box))
+                where ^= low
+
+        # Pointing: a digit confined to one row or column of a box
+        for box in range(size):
+            top, left = box - box % box_size, (box % box_size) * box_size
+            box_places = places[2 * size + box]
+            while pointing[box]:
+                bit = pointing[box] & -pointing[box]
+                pointing[box] ^= bit
+                digit = bit.bit_length() - 1
+                where = box_places[digit]
+                if where & (where - 1) == 0:
+                    continue
+                first = (where & -where).bit_length() - 1
+                if where & ~row_mask[first] == 0:
+                    line = top + first // box_size
+                    outside = places[line][digit] & ~segment[left]
+                elif where & ~col_mask[first] == 0:
+                    line = size + left + first % box_size
+                    outside = places[line][digit] & ~segment[top]
+                else:
+                    continue
+                if outside:
+                    remove(line, outside, bit)
+                    return "Pointing Pair"
+
+        # Claiming: a digit of a row or column confined to one box
+        for index in range(2 * size):
+            line = index % size
+            line_places = places[index]
+            while claiming[index]:
+                bit = claiming[index] & -claiming[index]
+                claiming[index] ^= bit
+                digit = bit.bit_length() - 1
+                where = line_places[digit]
+                if where & (where - 1) == 0:
+                    continue
+                first = (where & -where).bit_length() - 1
+                if where & ~segment[first]:
+                    continue
+                stripe = first - first % box_size
+                if index < size:
+                    box, inside = line - line % box_size + stripe // box_size, row_mask[(line % box_size) * box_size]
+                else:
+                    box, inside = stripe + line // box_size, col_mask[line % box_size]
+                others = places[2 * size + box][digit] & ~inside
+                if others:
+                    remove(2 * size + box, others, bit)
+                    return "Box/Line Reduction"
+
+        # Naked pairs: two cells of a unit sharing the same two candidates
+        for index in sorted(pair_units):
+            pair_units.discard(index)
+            pairs = {}  # mask: positions of the cells with exactly those candidates
+            for position, cell in enumerate(self.units[index]):
+                mask = candidates.get(cell, 0)
+                if mask.bit_count() == 2:
+                    pairs[mask] = pairs.get(mask, 0) | 1 << position
+            for mask, pair in pairs.items():
+                if pair.bit_count() != 2:
+                    continue
+                low = mask & -mask
+                others = (places[index][low.bit_length() - 1] | places[index][(mask ^ low).bit_length() - 1]) & ~pair
+                if others:
+                    pair_units.add(index)  # the unit may hold another pair
+                    remove(index, others, mask)
+                    return "Naked Pair"
+        return None
+
+    def next_hint(self):
+        """Return the cheapest forced move as a Hint, or None.
+
+        None means the grid is full or cannot be solved. If no technique
+        applies the move is read from the solution, with technique "Search".
+        """
+        if not self.board.valid or not self.candidates:
+            return None
+        hint = self._single(self.candidates, self.places, self.singles)
+        if hint is not None:
+            return hint or None
+
+        # Eliminations work on copies so the incremental state stays exact
+        candidates = dict(self.candidates)
+        places = [digits[:] for digits in self.places]
+        singles = set()
+        everything = (1 << self.size) - 1
+        pending = {"pointing": [everything] * self.size, "claiming": [everything] * (2 * self.size),
+                   "pairs": set(range(len(self.units)))}
+        used = []
+        while True:
+            touched = set()  # no unit held a hidden single before this round
+            technique = self._eliminate(candidates, places, singles, pending, touched)
+            if technique is None:
+                break
+            used.append(technique)
+            hint = self._single(candidates, places, singles, touched)
+            if hint is False:
+                return None
+            if hint:
+                return hint._replace(technique=f"{hint.technique} (after {', '.join(dict.fromkeys(used))})")
+
+        if self.solution is None:
+            result = solve(self.board.grid, self.size, method="dlx")
+            if not result.solved:
+                return None
+            self.solution = result.grid
+        (row, col), _ = most_constrained_cell(self.board, list(self.candidates))
+        return Hint(row, col, self.solution[row][col], "Search")
@@ -0,0 +1,47 @@
+import functools
+import math
+
+
+class BoardIndices:
+    """Flat index tables for one board size.
+
+    Cell i is (i // size, i % size). Units are numbered like
+    solver.unit_cells(): rows first, then columns, then boxes. Every table
+    is a tuple built once by get_indices(), so lookups in hot loops never
+    recompute offsets.
+    """
+
+    def __init__(self, size):
+        box_size = math.isqrt(size)
+        if size < 1 or box_size * box_size != size:
+            raise ValueError(f"Board size must be a perfect square, got {size}")
+        self.size = size
+        self.box_size = box_size
+        self.cell_count = size * size
+        cells = range(self.cell_count)
+        self.row_of = tuple(i // size for i in cells)
+        self.col_of = tuple(i % size for i in cells)
+        self.box_of = tuple(
+            (self.row_of[i] // box_size) * box_size + self.col_of[i] // box_size for i in cells
+        )
+
+        rows = tuple(tuple(range(row * size, (row + 1) * size)) for row in range(size))
+        cols = tuple(tuple(range(col, self.cell_count, size)) for col in range(size))
+        boxes = tuple(
+            tuple(i for i in cells if self.box_of[i] == box) for box in range(size)
+        )
+        self.units = rows + cols + boxes
+        # The three units of every cell: (row, size + col, 2 * size + box)
+        self.cell_units = tuple(
+            (self.row_of[i], size + self.col_of[i], 2 * size + self.box_of[i]) for i in cells
+        )
+        self.peers = tuple(
+            tuple(sorted({peer for unit in self.cell_units[i] for peer in self.units[unit]} - {i}))
+            for i in cells
+        )
+
+
+@functools.lru_cache(maxsize=None)
+def get_indices(size):
+    """Return the shared BoardIndices for boards of the given size."""
+    return BoardIndices(size)
@@ -0,0 +1,106 @@
+import contextlib
+import json
+import os
+import threading
+import time
+
+
+class Instrumentation:
+    """Counters, timers and sampled events recorded during one solve.
+
+    Solvers take an optional instrumentation argument and only touch it
+    when it is not None, so a solve without one pays nothing. Events are
+    kept in order up to max_events; when the buffer fills, every other
+    event is dropped and only every 2nd (then 4th, ...) later event is
+    kept, so long searches stay bounded but evenly covered.
+    """
+
+    def __init__(self, name="solve", max_events=100_000):
+        self.name = name
+        self.max_events = max_events
+        self.counters = {}
+        self.timers = {}  # name -> [calls, total seconds]
+        self.events = []  # (seconds since start, name, args, duration or None)
+        self.sample_every = 1
+        self.seen = 0
+        self.start = time.perf_counter()
+        self.lock = threading.Lock()  # solvers may report from a worker thread
+
+    def count(self, name, amount=1):
+        self.counters[name] = self.counters.get(name, 0) + amount
+
+    def event(self, name, **args):
+        """Record a sampled instant event."""
+        self.seen += 1
+        if self.seen % self.sample_every == 0:
+            self._record(time.perf_counter() - self.start, name, args, None)
+
+    def step(self, kind, **args):
+        """Count one search step of the given kind and record it as a sampled "step" event.
+
+        The event carries the step number, so sampled steps can be plotted
+        against it (see backtracking.plot_statistics).
+        """
+        steps = self.counters.get("steps", 0) + 1
+        self.counters["steps"] = steps
+        self.count(kind)
+        self.event("step", step=steps, kind=kind, **args)
+
+    def _record(self, timestamp, name, args, duration):
+        with self.lock:
+            self.events.append((timestamp, name, args, duration))
+            if len(self.events) >= self.max_events:
+                del self.events[::2]
+                self.sample_every *= 2
+
+    @contextlib.contextmanager
+    def timer(self, name, **args):
+        """Time a block; it is added to timers and recorded as a span event."""
+        begin = time.perf_counter()
+        try:
+            yield
+        finally:
+            end = time.perf_counter()
+            calls, total = self.timers.get(name, (0, 0.0))
+            self.timers[name] = [calls + 1, total + end - begin]
+            self._record(begin - self.start, name, args, end - begin)
+
+    def series(self, name, *keys):
+        """Return lists of the given args over the recorded events called name."""
+        rows = [args for _, event_name, args, _ in self.events if event_name == name]
+        return [[args.get(key) for args in rows] for key in keys]
+
+    def summary(self):
+        return {
+            "name": self.name,
+            "counters": dict(self.counters),
+            "timers": {name: {"calls": calls, "seconds": total} for name, (calls, total) in self.timers.items()},
+            "events": len(self.events),
+            "sample_every": self.sample_every,
+        }
+
+    def write_jsonl(self, path):
+        """Write the summary, then one JSON object per event."""
+        with open(path, "w") as output:
+            output.write(json.dumps({"type": "summary", **self.summary()}) + "\n")
+            for timestamp, name, args, duration in self.events:
+                record = {"type": "event", "name": name, "ts": round(timestamp, 6), "args": args}
+                if duration is not None:
+                    record["dur"] = round(duration, 6)
+                output.write(json.dumps(record) + "\n")
+
+    def write_chrome_trace(self, path):
+        """Write the events in Chrome trace format (chrome://tracing, Perfetto)."""
+        pid = os.getpid()
+        trace = []
+        for timestamp, name, args, duration in self.events:
+            event = {"name": name, "ts": timestamp * 1e6, "pid": pid, "tid": 0, "args": args}
+            if duration is None:
+                event.update(ph="i", s="t")
+            else:
+                event.update(ph="X", dur=duration * 1e6)
+            trace.append(event)
+        end = (time.perf_counter() - self.start) * 1e6
+        trace.append({"name": self.name, "ph": "C", "ts": end, "pid": pid, "tid": 0, "args": self.counters})
+        with open(path, "w") as output:
+            json.dump({"traceEvents": trace, "displayTimeUnit": "ms"}, output)
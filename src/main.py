@@ -1,4 +1,67 @@
-from gui import create_gui
+import argparse
+
+from benchmark import BACKENDS, CORPORA, DEFAULT_BACKENDS
+from generator import DIFFICULTIES
+from solver import SEARCH_METHODS
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Sudoku Puzzle Solver")
+    commands = parser.add_subparsers(dest="command")
+
+    batch_parser = commands.add_parser("batch", help="Solve puzzles from a file or stdin without the GUI")
+    batch_parser.add_argument("input", nargs="?", default="-", help="puzzle file, one puzzle per line (default: stdin)")
+    batch_parser.add_argument("-o", "--output", default="-", help="output file (default: stdout)")
+    batch_parser.add_argument("-m", "--method", default="dlx", choices=sorted(SEARCH_METHODS))
+    batch_parser.add_argument("-w", "--workers", type=int, default=1, help="worker processes")
+    batch_parser.add_argument("--chunk-size", type=int, default=256, help="puzzles sent to a worker at a time")
+
+    bench_parser = commands.add_parser("benchmark", help="Run the solver backends over the bundled puzzle corpora")
+    bench_parser.add_argument("--corpus", nargs="+", choices=list(CORPORA), help="corpora to run (default: all)")
+    bench_parser.add_argument("--backends", nargs="+", choices=list(BACKENDS), default=DEFAULT_BACKENDS)
+    bench_parser.add_argument("--seed", type=int, default=0, help="base seed for randomized backends")
+    bench_parser.add_argument("--json", help="write records and summary to this JSON file")
+    bench_parser.add_argument("--csv", help="write per-puzzle records to this CSV file")
+    bench_parser.add_argument("--no-memory", action="store_true", help="skip the tracemalloc peak-memory run")
+    bench_parser.add_argument("--imports", action="store_true", help="check module import times against their budgets")
+
+    generate_parser = commands.add_parser("generate", help="Generate puzzles with a unique solution")
+    generate_parser.add_argument("-n", "--count", type=int, default=1, help="number of puzzles")
+    generate_parser.add_argument("-s", "--size", type=int, default=9, choices=[4, 9, 16, 25], help="board size")
+    generate_parser.add_argument("-d", "--difficulty", default="easy", choices=DIFFICULTIES)
+    generate_parser.add_argument("-w", "--workers", type=int, default=1, help="worker processes")
+    generate_parser.add_argument("--seed", type=int, help="seed for reproducible output")
+
+    grade_parser = commands.add_parser("grade", help="Check puzzles or solutions for conflicts and completeness")
+    grade_parser.add_argument("input", nargs="?", default="-", help="grid file, one grid per line (default: stdin)")
+
+    serve_parser = commands.add_parser("serve", help="Serve solves over HTTP/JSON on a warm process pool")
+    serve_parser.add_argument("--host", default="127.0.0.1", help="address to listen on (default: localhost only)")
+    serve_parser.add_argument("-p", "--port", type=int, default=8765)
+    serve_parser.add_argument("-w", "--workers", type=int, default=2, help="worker processes")
+    serve_parser.add_argument("--timeout", type=float, default=30.0, help="default per-request timeout in seconds")
+    return parser.parse_args(argv)
+
 
 if __name__ == "__main__":
-    create_gui()
+    args = parse_args()
+    if args.command == "batch":
+        import batch
+        batch.main(args)
+    elif args.command == "generate":
+        import batch
+        import generator
+        for grid, _ in generator.generate_many(args.count, args.size, args.difficulty, args.seed, args.workers):
+            print(batch.format_grid(grid))
+    elif args.command == "grade":
+        import grader
+        grader.main(args)
+    elif args.command == "serve":
+        import service
+        service.main(args)
+    elif args.command == "benchmark":
+        import benchmark
+        benchmark.main(args)
+    else:
+        from gui import run_gui
+        run_gui()
@@ -0,0 +1,137 @@
+import collections
+import time
+
+from solver import SolveResult, is_solution, solve
+
+# Backends raced by default: (label, method, options), strongest first so
+# they start first when workers is capped. The backtracking variants differ
+# only in the order they fill cells, the genetic ones in their seed, so one
+# that gets unlucky on a puzzle is covered by another.
+PORTFOLIO = [
+    ("mrv", "mrv", {}),
+    ("ordered:fewest", "ordered", {"cell_order": "fewest"}),
+    ("ordered:rows", "ordered", {"cell_order": "rows"}),
+    ("ordered:columns", "ordered", {"cell_order": "columns"}),
+    ("genetic:0", "genetic", {"seed": 0}),
+    ("genetic:1", "genetic", {"seed": 1}),
+]
+
+
+POLL_INTERVAL = 0.05  # seconds between checks for backends that died without reporting
+
+
+class PortfolioResult(SolveResult):
+    """A SolveResult plus the label of the backend that won, or None."""
+
+    __slots__ = ("winner",)
+
+    def __init__(self, grid, winner=None, **counters):
+        super().__init__(grid, **counters)
+        self.winner = winner
+
+    def __repr__(self):
+        return f"{super().__repr__()[:-1]}, winner={self.winner!r})"
+
+
+def _race(label, grid, method, options, results):
+    result = solve(grid, len(grid), method=method, **options)
+    results.put((label, result.grid, result.nodes, result.backtracks, result.generations))
+
+
+def solve_portfolio(grid, backends=None, deadline=10.0, workers=None, seed=None, log_path=None):
+    """Race several backends on grid in separate processes; returns a PortfolioResult.
+
+    backends is a list of (label, method, options), PORTFOLIO by default.
+    At most workers (default: all of them) run at a time; the others start
+    as those finish without a solution; racing more backends than there are
+    cores still pays off, since the OS shares the cores out between them.
+    The first solution that passes is_solution() wins and every process
+    still running is terminated, as are all of them once deadline seconds
+    have passed. A backend that crashes counts as failed and makes room for
+    the next one, so a race in which every backend fails ends at once. A
+    seed is added to the genetic backends' own seeds. If log_path is given
+    a JSON line recording the winner and the time is appended to it for
+    later tuning (see win_counts()).
+    """
+    start = time.perf_counter()
+    backends = list(backends or PORTFOLIO)
+    if seed is not None:
+        backends = [
+            (label, method, {**options, "seed": options.get("seed", 0) + seed} if "seed" in options else options)
+            for label, method, options in backends
+        ]
+    workers = max(1, min(workers or len(backends), len(backends)))
+
+    import multiprocessing  # imported lazily, like json: they cost more than the rest of the module
+    import queue
+
+    context = multiprocessing.get_context()
+    results = context.Queue()
+    pending = collections.deque(backends)
+    running = {}
+
+    def launch():
+        label, method, options = pending.popleft()
+        process = context.Process(target=_race, args=(label, grid, method, options, results), daemon=True)
+        process.start()
+        running[label] = process
+
+    winner, solution, counters = None, None, {}
+    failed = []
+    try:
+        while pending and len(running) < workers:
+            launch()
+        while running:
+            remaining = deadline - (time.perf_counter() - start)
+            if remaining <= 0:
+                break
+            try:
+                label, found, nodes, backtracks, generations = results.get(timeout=min(remaining, POLL_INTERVAL))
+            except queue.Empty:
+                # A backend that raised or was killed never reports: retire it
+                for label, process in list(running.items()):
+                    if process.exitcode not in (None, 0):
+                        del running[label]
+                        failed.append(label)
+                        if pending:
+                            launch()
+                continue
+            running.pop(label).join()
+            if is_solution(found, grid):
+                winner, solution = label, found
+                counters = {"nodes": nodes, "backtracks": backtracks, "generations": generations}
+                break
+            failed.append(label)
+            if pending:
+                launch()
+    finally:
+        for process in running.values():
+            process.terminate()
+        for process in running.values():
+            process.join()
+        results.close()
+
+    result = PortfolioResult(solution, winner, elapsed=time.perf_counter() - start, **counters)
+    if log_path is not None:
+        import json
+
+        record = {
+            "board_size": len(grid),
+            "clues": sum(1 for row in grid for value in row if value),
+            "winner": winner,
+            "elapsed": round(result.elapsed, 4),
+            "deadline": deadline,
+            "backends": [label for label, _, _ in backends],
+            "failed": failed,
+        }
+        with open(log_path, "a") as log:
+            log.write(json.dumps(record) + "\n")
+    return result
+
+
+def win_counts(log_path):
+    """Count the wins per backend (None for timeouts) recorded in a portfolio log."""
+    import json
+
+    with open(log_path) as log:
+        return collections.Counter(json.loads(line)["winner"] for line in log if line.strip())
@@ -0,0 +1,57 @@
+import threading
+import tkinter as tk
+
+
+class BoardRenderer:
+    """Draw solver progress into a grid of Entry widgets at a capped frame rate.
+
+    submit() only records the latest grid and may be called from any thread
+    (the genetic solver reports from a worker thread); a Tk timer running on
+    the main thread draws it at most fps times per second. Drawing compares
+    against what each Entry already shows and rewrites only changed cells.
+    """
+
+    def __init__(self, root, entries, fps=30):
+        self.root = root
+        self.entries = entries
+        self.interval = max(1, int(1000 / fps))
+        self.shown = [[None] * len(row) for row in entries]
+        self.pending = None
+        self.lock = threading.Lock()
+        self.root.after(self.interval, self._tick)
+
+    def invalidate(self):
+        """Forget what the cells show, e.g. after the user has typed in them."""
+        self.shown = [[None] * len(row) for row in self.entries]
+
+    def submit(self, grid):
+        """Queue grid for the next frame; it is read when the frame is drawn."""
+        with self.lock:
+            self.pending = grid
+
+    def draw(self, grid):
+        """Draw grid now (main thread only), dropping any queued frame."""
+        with self.lock:
+            self.pending = None
+        for i, row in enumerate(grid):
+            shown_row = self.shown[i]
+            for j, value in enumerate(row):
+                if shown_row[j] != value:
+                    entry = self.entries[i][j]
+                    entry.delete(0, tk.END)
+                    if value != 0:
+                        entry.insert(tk.END, value)
+                    shown_row[j] = value
+
+    def flush(self):
+        """Draw the queued frame, if any, without waiting for the timer."""
+        with self.lock:
+            grid = self.pending
+        if grid is not None:
+            self.draw(grid)
+
+    def _tick(self):
+        if not self.entries[0][0].winfo_exists():
+            return  # the board was destroyed
+        self.flush()
+        self.root.after(self.interval, self._tick)
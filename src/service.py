@@ -0,0 +1,334 @@
+import asyncio
+import json
+import math
+import multiprocessing
+import os
+import signal
+import time
+from collections import deque
+
+from batch import parse_puzzle, serve_requests
+from solver import CELL_ORDERS, SEARCH_METHODS
+
+# Extra names accepted for the "method" field of a request
+METHOD_ALIASES = {"backtracking": "ordered"}
+MAX_BODY = 1 << 20
+LATENCY_WINDOW = 1000  # latest requests the percentiles are computed over
+# Workers are replaced from inside the event loop, so they must not be
+# forked from it: a forked worker would inherit the listening socket and
+# every open client connection, and closing one would not reach the client.
+WORKER_START_METHOD = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+
+# Solver options a request may set, per method: (low, high) bounds for
+# numbers (integers when both bounds are), or a tuple of allowed strings.
+# Anything else is rejected, so a request cannot pass instrumentation,
+# callbacks or a population that exhausts a worker.
+MAX_NODES = (1, 10**9)
+GENETIC_OPTIONS = {
+    "population_size": (10, 20_000),
+    "generations": (1, 10_000),
+    "mutation_prob": (0.0, 1.0),
+    "seed": (0, 2**32 - 1),
+}
+METHOD_OPTIONS = {
+    "ordered": {"max_nodes": MAX_NODES, "cell_order": tuple(CELL_ORDERS)},
+    "mrv": {"max_nodes": MAX_NODES},
+    "dlx": {"max_nodes": MAX_NODES},
+    "genetic": GENETIC_OPTIONS,
+    "hybrid": {
+        **GENETIC_OPTIONS,
+        "time_limit": (0.0, 300.0),
+        "patience": (1, 1000),
+        "anneal_steps": (0, 1_000_000),
+        "stall_searches": (1, 1000),
+    },
+    "island": {
+        **GENETIC_OPTIONS,
+        "islands": (1, 8),
+        "migration_interval": (1, 1000),
+        "migrants": (1, 1000),
+    },
+}
+
+STATUS_TEXT = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+               413: "Payload Too Large", 500: "Internal Server Error", 504: "Gateway Timeout"}
+
+
+class RequestError(Exception):
+    """A request the service rejects, with the HTTP status to answer."""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+def check_options(method, options):
+    """Validate options against METHOD_OPTIONS[method]; raises RequestError."""
+    if not isinstance(options, dict):
+        raise RequestError(400, "options must be a JSON object")
+    rules = METHOD_OPTIONS.get(method, {})
+    for name, value in options.items():
+        rule = rules.get(name)
+        if rule is None:
+            raise RequestError(400, f"Option {name!r} is not accepted for method {method!r}")
+        if isinstance(rule[0], str):
+            if value not in rule:
+                raise RequestError(400, f"{name} must be one of {', '.join(rule)}")
+            continue
+        low, high = rule
+        kind = int if isinstance(low, int) and isinstance(high, int) else (int, float)
+        if isinstance(value, bool) or not isinstance(value, kind) or not low <= value <= high:
+            raise RequestError(400, f"{name} must be a number from {low} to {high}")
+
+
+def parse_request(body):
+    """Validate a /solve request body; returns (grid, method, timeout, options)."""
+    try:
+        request = json.loads(body or b"{}")
+    except ValueError as error:
+        raise RequestError(400, f"Invalid JSON: {error}")
+    if not isinstance(request, dict):
+        raise RequestError(400, "The request must be a JSON object")
+
+    if "puzzle" in request:
+        if not isinstance(request["puzzle"], str):
+            raise RequestError(400, "puzzle must be a string")
+        try:
+            grid = parse_puzzle(request["puzzle"])
+        except ValueError as error:
+            raise RequestError(400, str(error))
+    else:
+        grid = request.get("grid")
+        size = len(grid) if isinstance(grid, list) else 0
+        if size not in (4, 9, 16, 25) or any(not isinstance(row, list) or len(row) != size for row in grid):
+            raise RequestError(400, "grid must be a 4x4, 9x9, 16x16 or 25x25 list of rows")
+        if any(isinstance(num, bool) or not isinstance(num, int) or not 0 <= num <= size for row in grid for num in row):
+            raise RequestError(400, f"grid values must be integers from 0 to {size}")
+
+    method = request.get("method", "dlx")
+    if not isinstance(method, str):
+        raise RequestError(400, "method must be a string")
+    method = METHOD_ALIASES.get(method, method)
+    if method not in SEARCH_METHODS or method not in METHOD_OPTIONS:
+        raise RequestError(400, f"Unknown method {request.get('method')!r}")
+    timeout = request.get("timeout")
+    if timeout is not None and (isinstance(timeout, bool) or not isinstance(timeout, (int, float)) or timeout <= 0):
+        raise RequestError(400, "timeout must be a positive number of seconds")
+    options = request.get("options", {})
+    check_options(method, options)
+    return grid, method, timeout, options
+
+
+def percentile(values, fraction):
+    """Nearest-rank percentile of a non-empty sorted list."""
+    return values[max(0, math.ceil(fraction * len(values)) - 1)]
+
+
+class _Worker:
+    """A solver process running batch.serve_requests, fed over a pipe."""
+
+    def __init__(self):
+        context = multiprocessing.get_context(WORKER_START_METHOD)
+        self.connection, child = context.Pipe()
+        self.process = context.Process(target=serve_requests, args=(child,))
+        self.process.start()
+        child.close()
+        self.ready = False  # set once its "ready" message has been read
+
+    async def receive(self):
+        """Wait for the next message without blocking the event loop."""
+        loop = asyncio.get_running_loop()
+        readable = loop.create_future()
+        fd = self.connection.fileno()
+        loop.add_reader(fd, lambda: readable.done() or readable.set_result(None))
+        try:
+            await readable
+        finally:
+            loop.remove_reader(fd)
+        return self.connection.recv()
+
+    def kill(self):
+        """Kill the worker and every process it started, wherever its solve is."""
+        try:
+            os.killpg(self.process.pid, signal.SIGKILL)
+        except (AttributeError, ProcessLookupError, PermissionError):
+            self.process.kill()  # no process groups, or not its own group yet
+        self.process.join()
+        self.connection.close()
+
+
+class SolveService:
+    """Solve requests on warm worker processes, at most workers at a time.
+
+    Requests beyond that wait in a queue; a request's timeout covers its
+    waiting and solving time. A solve still running at the timeout is
+    killed with its worker, which is replaced by a fresh one, so a runaway
+    search never holds a worker past its request's deadline.
+    """
+
+    def __init__(self, workers=2, default_timeout=30.0):
+        self.workers = workers
+        self.default_timeout = default_timeout
+        self.idle = None
+        self.processes = set()  # every live worker, idle or busy
+        self.waiting = 0
+        self.in_flight = 0
+        self.counts = {"completed": 0, "timeouts": 0, "errors": 0, "rejected": 0}
+        self.latencies = deque(maxlen=LATENCY_WINDOW)
+
+    def _spawn(self):
+        worker = _Worker()
+        self.processes.add(worker)
+        return worker
+
+    async def start(self):
+        self.idle = asyncio.Queue()
+        workers = [self._spawn() for _ in range(self.workers)]
+        for worker, message in zip(workers, await asyncio.gather(*(worker.receive() for worker in workers))):
+            worker.ready = message == "ready"
+            self.idle.put_nowait(worker)
+
+    def close(self):
+        for worker in self.processes:
+            worker.kill()
+        self.processes.clear()
+
+    async def solve(self, grid, method, timeout, options):
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + (timeout or self.default_timeout)
+        self.waiting += 1
+        try:
+            worker = await asyncio.wait_for(self.idle.get(), deadline - loop.time())
+        finally:
+            self.waiting -= 1
+        self.in_flight += 1
+        try:
+            reply = await asyncio.wait_for(self._run(worker, grid, method, options), max(0.0, deadline - loop.time()))
+        except BaseException:
+            # Timed out, cancelled or the worker died: its solve may still be running
+            worker.kill()
+            self.processes.discard(worker)
+            worker = self._spawn()
+            raise
+        finally:
+            self.in_flight -= 1
+            self.idle.put_nowait(worker)
+        status, value = reply
+        if status == "error":
+            raise RuntimeError(value)
+        return value
+
+    async def _run(self, worker, grid, method, options):
+        if not worker.ready:  # a replacement worker still warming up
+            worker.ready = await worker.receive() == "ready"
+        worker.connection.send((grid, method, options))
+        return await worker.receive()
+
+    def stats(self):
+        latencies = sorted(self.latencies)
+        summary = {
+            "workers": self.workers,
+            "queue_depth": self.waiting,
+            "in_flight": self.in_flight,
+            **self.counts,
+            "latency_ms": None,
+        }
+        if latencies:
+            summary["latency_ms"] = {
+                "p50": percentile(latencies, 0.50),
+                "p90": percentile(latencies, 0.90),
+                "p99": percentile(latencies, 0.99),
+                "max": latencies[-1],
+                "window": len(latencies),
+            }
+        return summary
+
+    async def handle_solve(self, body):
+        start = time.perf_counter()
+        try:
+            grid, method, timeout, options = parse_request(body)
+        except RequestError:
+            self.counts["rejected"] += 1
+            raise
+        try:
+            result = await self.solve(grid, method, timeout, options)
+        except asyncio.TimeoutError:
+            self.counts["timeouts"] += 1
+            raise RequestError(504, "The solve did not finish within the timeout")
+        latency = round((time.perf_counter() - start) * 1000, 3)
+        self.counts["completed"] += 1
+        self.latencies.append(latency)
+        return {"method": method, "latency_ms": latency, **result}
+
+    async def route(self, method, path, body):
+        if path == "/solve":
+            if method != "POST":
+                raise RequestError(405, "Use POST /solve")
+            return await self.handle_solve(body)
+        if path == "/stats":
+            return self.stats()
+        if path == "/health":
+            return {"status": "ok"}
+        raise RequestError(404, f"No such endpoint: {path}")
+
+    async def handle_connection(self, reader, writer):
+        """Serve one HTTP/1.1 request and close the connection."""
+        try:
+            request_line = await reader.readline()
+            parts = request_line.decode("latin-1").split()
+            headers = {}
+            while True:
+                line = await reader.readline()
+                if line in (b"\r\n", b"\n", b""):
+                    break
+                name, _, value = line.decode("latin-1").partition(":")
+                headers[name.strip().lower()] = value.strip()
+            try:
+                if len(parts) != 3:
+                    raise RequestError(400, "Malformed request line")
+                length = headers.get("content-length", "0")
+                if not length.isdecimal():
+                    raise RequestError(400, "Content-Length must be a non-negative integer")
+                length = int(length)
+                if length > MAX_BODY:
+                    raise RequestError(413, "Request body too large")
+                body = await reader.readexactly(length) if length else b""
+                status, payload = 200, await self.route(parts[0], parts[1].split("?")[0], body)
+            except RequestError as error:
+                status, payload = error.status, {"error": str(error)}
+            except Exception as error:  # keep serving after a solver crash
+                self.counts["errors"] += 1
+                status, payload = 500, {"error": f"{type(error).__name__}: {error}"}
+            data = json.dumps(payload).encode()
+            writer.write(
+                f"HTTP/1.1 {status} {STATUS_TEXT[status]}\r\n"
+                f"Content-Type: application/json\r\nContent-Length: {len(data)}\r\nConnection: close\r\n\r\n".encode()
+                + data
+            )
+            await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+
+async def serve(host="127.0.0.1", port=8765, workers=2, timeout=30.0, ready=None):
+    """Run the service until cancelled; ready(port) is called once it listens."""
+    service = SolveService(workers, timeout)
+    await service.start()
+    server = await asyncio.start_server(service.handle_connection, host, port)
+    try:
+        if ready:
+            ready(server.sockets[0].getsockname()[1])
+        async with server:
+            await server.serve_forever()
+    finally:
+        service.close()
+
+
+def main(args):
+    print(f"Serving on http://{args.host}:{args.port} with {args.workers} workers")
+    try:
+        asyncio.run(serve(args.host, args.port, args.workers, args.timeout))
+    except KeyboardInterrupt:
+        pass
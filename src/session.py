@@ -0,0 +1,326 @@
+import json
+import os
+import threading
+import time
+import zipfile
+
+import numpy as np
+
+from bitboard import BitBoard
+from Generic import adapt_mutation, evolve, fixed_mask, make_population_array, population_fitness
+
+# Session states; run() leaves a session in any of the last four
+STATES = ["ready", "running", "paused", "cancelled", "solved", "failed"]
+
+
+def _write_atomic(path, write):
+    """Write a checkpoint through a temporary file so a crash never leaves half of one."""
+    temp = f"{path}.tmp"
+    with open(temp, "wb") as output:
+        write(output)
+    os.replace(temp, path)
+
+
+class SolverSession:
+    """A solver run that can be paused, cancelled, checkpointed and resumed.
+
+    Subclasses implement step(), which does one unit of work and returns
+    True when solved, False when the search is exhausted and None otherwise.
+    pause() and cancel() may be called from any thread; run() notices them
+    between steps and returns. After a pause, call run() again once resume()
+    returns True.
+    """
+
+    progress_every = 1  # steps between progress callbacks in run()
+
+    def __init__(self):
+        self.status = "ready"
+        self.steps = 0
+        self._pause = threading.Event()
+        self._cancel = threading.Event()
+
+    @property
+    def done(self):
+        return self.status in ("cancelled", "solved", "failed")
+
+    @property
+    def pause_requested(self):
+        return self._pause.is_set()
+
+    def pause(self):
+        self._pause.set()
+
+    def resume(self):
+        """Withdraw a pause; True if the session had stopped and must be run again."""
+        self._pause.clear()
+        if self.status == "paused":
+            self.status = "ready"
+            return True
+        return False
+
+    def cancel(self):
+        self._cancel.set()
+        if self.status in ("ready", "paused"):
+            self.status = "cancelled"  # nothing is running to notice the request
+
+    def _interrupted(self):
+        """Set the status for a pending pause or cancel; True if there was one."""
+        if self._cancel.is_set():
+            self.status = "cancelled"
+        elif self._pause.is_set():
+            self.status = "paused"
+        else:
+            return False
+        return True
+
+    def _advance(self):
+        outcome = self.step()
+        self.steps += 1
+        if outcome is not None:
+            self.status = "solved" if outcome else "failed"
+        return outcome
+
+    def run(self, progress_callback=None, checkpoint_path=None, checkpoint_interval=60.0):
+        """Step until solved, exhausted, paused or cancelled; returns the status.
+
+        With checkpoint_path the session is saved every checkpoint_interval
+        seconds and when it is paused, so a killed process can resume from
+        load_session(checkpoint_path).
+        """
+        if self.done:
+            return self.status
+        self.status = "running"
+        last_save = time.monotonic()
+        while not self._interrupted():
+            if self._advance() is not None:
+                break
+            if progress_callback and self.steps % self.progress_every == 0:
+                progress_callback(self.grid)
+            if checkpoint_path and time.monotonic() - last_save >= checkpoint_interval:
+                self.save(checkpoint_path)
+                last_save = time.monotonic()
+        if progress_callback:
+            progress_callback(self.grid)
+        if checkpoint_path and self.status == "paused":
+            self.save(checkpoint_path)
+        return self.status
+
+    def run_tk(self, root, progress_callback=None, on_finish=None, slice_ms=10):
+        """Run on the Tk event loop in time slices of about slice_ms.
+
+        Progress is reported once per slice; on_finish(status) is called when
+        the session is solved, exhausted, paused or cancelled.
+        """
+        if self.done:
+            return
+
+        def run_slice():
+            deadline = time.perf_counter() + slice_ms / 1000
+            while not self._interrupted():
+                if self._advance() is not None:
+                    break
+                if time.perf_counter() >= deadline:
+                    if progress_callback:
+                        progress_callback(self.grid)
+                    root.after(1, run_slice)
+                    return
+            if progress_callback:
+                progress_callback(self.grid)
+            if on_finish:
+                on_finish(self.status)
+
+        self.status = "running"
+        root.after(0, run_slice)
+
+    @property
+    def grid(self):
+        raise NotImplementedError
+
+    def step(self):
+        raise NotImplementedError
+
+    def save(self, path):
+        raise NotImplementedError
+
+
+class BacktrackingSession(SolverSession):
+    """Cell-by-cell backtracking, one placement per step.
+
+    SL is the stack of filled cells, NSL the stack of (cell, last number,
+    tried numbers) frames still to explore. Only the number of dead ends
+    (DE) is kept, not the cells, so long runs do not grow without bound.
+    Checkpoints are JSON. If an Instrumentation is given every step is
+    recorded in it.
+    """
+
+    progress_every = 1000
+
+    def __init__(self, grid, empty_cells=None, SL=None, NSL=None, DE=0, instrumentation=None):
+        super().__init__()
+        self.instrumentation = instrumentation
+        self.arr = [row[:] for row in grid]
+        self.board = BitBoard(self.arr)
+        if empty_cells is None:
+            empty_cells = [(row, col) for row in range(len(grid)) for col in range(len(grid)) if grid[row][col] == 0]
+        self.empty_cells = [tuple(cell) for cell in empty_cells]
+        self.SL = [tuple(cell) for cell in SL] if SL is not None else []
+        if NSL is None:
+            NSL = [(self.empty_cells[0], 0, [])] if self.empty_cells else []
+        self.NSL = [(tuple(cell), last_num, list(tried)) for cell, last_num, tried in NSL]
+        self.DE = DE
+        if not self.board.valid:
+            self.status = "failed"
+
+    @property
+    def grid(self):
+        return self.arr
+
+    def step(self):
+        if len(self.SL) == len(self.empty_cells):
+            return True
+        if not self.NSL:
+            return False
+        cell, last_num, tried_nums = self.NSL.pop()
+        row, col = cell
+        self.board.unplace(row, col)
+        candidates = self.board.candidates(row, col)
+        for num in range(last_num + 1, self.board.size + 1):
+            if num not in tried_nums and (candidates >> (num - 1)) & 1:
+                self.board.place(row, col, num)
+                self.SL.append(cell)
+                self.NSL.append((cell, num, tried_nums + [num]))
+                if len(self.SL) < len(self.empty_cells):
+                    self.NSL.append((self.empty_cells[len(self.SL)], 0, []))
+                if self.instrumentation is not None:
+                    self.instrumentation.step("place", solved=len(self.SL), backtracks=self.DE)
+                return None
+        if self.SL:
+            self.SL.pop()
+            self.DE += 1
+            if self.instrumentation is not None:
+                self.instrumentation.step("backtrack", solved=len(self.SL), backtracks=self.DE)
+            return None
+        return False
+
+    def save(self, path):
+        state = {
+            "kind": "backtracking",
+            "status": "paused" if self.status == "running" else self.status,
+            "steps": self.steps,
+            "grid": self.arr,
+            "empty_cells": self.empty_cells,
+            "SL": self.SL,
+            "NSL": self.NSL,
+            "DE": self.DE,
+        }
+        _write_atomic(path, lambda output: output.write(json.dumps(state).encode()))
+
+    @classmethod
+    def load(cls, path):
+        with open(path) as source:
+            state = json.load(source)
+        # The grid holds the numbers placed so far; SL says which of them are guesses
+        session = cls(state["grid"], state["empty_cells"], state["SL"], state["NSL"], state["DE"])
+        session.steps = state["steps"]
+        session.status = "ready" if state["status"] in ("running", "paused") else state["status"]
+        return session
+
+
+class GeneticSession(SolverSession):
+    """The genetic algorithm of Generic.py, one generation per step.
+
+    Checkpoints are NumPy .npz archives holding the population, its scores,
+    the best chromosome and the generator state, so a resumed run continues
+    exactly where the saved one stopped.
+    """
+
+    def __init__(self, initial_grid, population_size=7000, generations=1200, mutation_prob=0.2, seed=None):
+        super().__init__()
+        self.initial_grid = [row[:] for row in initial_grid]
+        self.generations = generations
+        self.mutation_prob = mutation_prob
+        self.rng = np.random.default_rng(seed)
+        self.fixed = fixed_mask(initial_grid)
+        self.elite_size = max(1, population_size // 10)
+        self.population = make_population_array(population_size, initial_grid, self.rng)
+        self.scores = population_fitness(self.population)
+        best_index = int(np.argmin(self.scores))
+        self.best_solution = self.population[best_index].copy()
+        self.best_score = int(self.scores[best_index])
+        self.current_index = best_index
+        self.stagnation = 0
+        self.generation = 0
+
+    @property
+    def grid(self):
+        if self.best_score == 0:
+            return self.best_solution.tolist()
+        return self.population[self.current_index].tolist()
+
+    def step(self):
+        if self.best_score == 0:
+            return True
+        if self.generation >= self.generations:
+            return False
+        self.population, self.scores = evolve(
+            self.population, self.scores, self.fixed, self.mutation_prob, self.rng, self.elite_size
+        )
+        self.generation += 1
+        self.current_index = int(np.argmin(self.scores))
+        current_score = int(self.scores[self.current_index])
+        if current_score < self.best_score:
+            self.best_solution = self.population[self.current_index].copy()
+            self.best_score = current_score
+            self.stagnation = 0
+        else:
+            self.stagnation += 1
+        self.mutation_prob = adapt_mutation(self.mutation_prob, self.stagnation)
+        return True if self.best_score == 0 else None
+
+    def save(self, path):
+        meta = {
+            "kind": "genetic",
+            "status": "paused" if self.status == "running" else self.status,
+            "steps": self.steps,
+            "initial_grid": self.initial_grid,
+            "generations": self.generations,
+            "generation": self.generation,
+            "mutation_prob": self.mutation_prob,
+            "stagnation": self.stagnation,
+            "best_score": self.best_score,
+            "current_index": self.current_index,
+            "rng": self.rng.bit_generator.state,
+        }
+        _write_atomic(path, lambda output: np.savez(
+            output,
+            population=self.population,
+            scores=self.scores,
+            best_solution=self.best_solution,
+            meta=np.array(json.dumps(meta)),
+        ))
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as archive:
+            meta = json.loads(str(archive["meta"]))
+            session = cls.__new__(cls)
+            SolverSession.__init__(session)
+            session.population = archive["population"]
+            session.scores = archive["scores"]
+            session.best_solution = archive["best_solution"]
+        session.initial_grid = meta["initial_grid"]
+        session.fixed = fixed_mask(session.initial_grid)
+        session.elite_size = max(1, len(session.population) // 10)
+        session.rng = np.random.default_rng()
+        session.rng.bit_generator.state = meta["rng"]
+        for name in ("steps", "generations", "generation", "mutation_prob", "stagnation", "best_score", "current_index"):
+            setattr(session, name, meta[name])
+        session.status = "ready" if meta["status"] in ("running", "paused") else meta["status"]
+        return session
+
+
+def load_session(path):
+    """Load a checkpoint written by either session type."""
+    if zipfile.is_zipfile(path):
+        return GeneticSession.load(path)
+    return BacktrackingSession.load(path)
@@ -1,38 +1,336 @@
+import itertools
 import time
-from logging import root
-
-from utils import check_location_is_safe
-global board_size
-
-def solve_sudoku_async(arr, empty_cells, SL, NSL, DE, update_gui, root, delay=0):
-    if len(SL) == len(empty_cells):  # Base case: solved
-        update_gui(arr)
-        return True
-
-    if NSL:
-        CS, last_num, tried_nums = NSL.pop()
-        row, col = CS
-
-        for num in range(last_num + 1, board_size + 1):
-            if num not in tried_nums and check_location_is_safe(arr, row, col, num):
-                arr[row][col] = num
-                SL.append(CS)
-                NSL.append((CS, num, tried_nums + [num]))
-                update_gui(arr)
-
-                if len(SL) < len(empty_cells):
-                    next_cell = empty_cells[len(SL)]
-                    NSL.append((next_cell, 0, []))
-
-                # Schedule the next step after a delay
-                root.after(delay, lambda: solve_sudoku_async(arr, empty_cells, SL, NSL, DE, update_gui, root, delay))
-                return True
+
+from bitboard import BitBoard
+from context import get_context
+from dlx import solve_dlx
+
+
+class SolveResult:
+    """Outcome of a headless solve.
+
+    A plain class rather than a dataclass: importing dataclasses costs
+    more than the rest of this module, and every pool worker imports it.
+    """
+
+    __slots__ = ("grid", "nodes", "backtracks", "generations", "elapsed")
+
+    def __init__(self, grid, nodes=0, backtracks=0, generations=0, elapsed=0.0):
+        self.grid = grid  # the solved grid, or None when no solution was found
+        self.nodes = nodes  # placements tried
+        self.backtracks = backtracks  # cells undone after running out of candidates
+        self.generations = generations  # genetic algorithm generations run
+        self.elapsed = elapsed  # wall time in seconds
+
+    def __repr__(self):
+        fields = ", ".join(f"{name}={getattr(self, name)!r}" for name in SolveResult.__slots__)
+        return f"{type(self).__name__}({fields})"
+
+    @property
+    def solved(self):
+        return self.grid is not None
+
+
+def unit_cells(board_size):
+    """Rows, columns and boxes of a board, each as a tuple of (row, col).
+
+    The tables are shared through the board's context; do not modify them.
+    """
+    return get_context(board_size).units
+
+
+def propagate(board, units, trail):
+    """Place naked and hidden singles until none are left.
+
+    Every placement is appended to trail so the caller can undo it. Returns
+    False as soon as a cell has no candidate or a digit has no cell left in
+    some unit.
+    """
+    grid = board.grid
+    changed = True
+    while changed:
+        changed = False
+        # Naked singles: cells with exactly one candidate
+        for unit in units[:board.size]:
+            for row, col in unit:
+                if grid[row][col] == 0:
+                    mask = board.candidates(row, col)
+                    if not mask:
+                        return False
+                    if mask & (mask - 1) == 0:
+                        board.place(row, col, mask.bit_length())
+                        trail.append((row, col))
+                        changed = True
+
+        # Hidden singles: digits that fit in only one cell of a unit
+        for unit in units:
+            once = twice = placed = 0
+            for row, col in unit:
+                num = grid[row][col]
+                if num:
+                    placed |= 1 << (num - 1)
+                else:
+                    mask = board.candidates(row, col)
+                    twice |= once & mask
+                    once |= mask
+            if (once | placed) != board.full:
+                return False
+            hidden = once & ~twice
+            if not hidden:
+                continue
+            for row, col in unit:
+                if grid[row][col] == 0:
+                    mask = board.candidates(row, col) & hidden
+                    if mask:
+                        if mask & (mask - 1):
+                            return False  # two digits forced into the same cell
+                        board.place(row, col, mask.bit_length())
+                        trail.append((row, col))
+                        changed = True
+    return True
+
+
+def most_constrained_cell(board, cells):
+    """Return (cell, candidates) for the empty cell with the fewest candidates.
+
+    cell is None once every cell is filled.
+    """
+    grid = board.grid
+    best = None
+    best_mask = 0
+    best_count = board.size + 1
+    for row, col in cells:
+        if grid[row][col] == 0:
+            mask = board.candidates(row, col)
+            count = mask.bit_count()
+            if count < best_count:
+                best, best_mask, best_count = (row, col), mask, count
+                if count <= 1:
+                    break
+    return best, best_mask
+
+
+def _undo(board, trail, mark):
+    while len(trail) > mark:
+        board.unplace(*trail.pop())
+
+
+# Cell orders for the "ordered" search (option cell_order), as sort keys;
+# "fewest" ranks cells by their candidates before the search starts.
+CELL_ORDERS = {
+    "rows": None,
+    "columns": lambda board, cell: (cell[1], cell[0]),
+    "reverse": lambda board, cell: (-cell[0], -cell[1]),
+    "fewest": lambda board, cell: board.candidates(*cell).bit_count(),
+}
+
+
+def _solve_ordered(board, empty_cells, progress_callback, progress_interval, max_nodes, options):
+    cell_order = options.get("cell_order", "rows")
+    if cell_order not in CELL_ORDERS:
+        raise ValueError(f"Unknown cell order: {cell_order}")
+    if CELL_ORDERS[cell_order] is not None:
+        empty_cells = sorted(empty_cells, key=lambda cell: CELL_ORDERS[cell_order](board, cell))
+    nodes = 0
+    DE = 0  # backtrack count
+    NSL = [(0, 0)]  # (index into empty_cells, last number tried there)
+    while NSL:
+        index, last_num = NSL.pop()
+        row, col = empty_cells[index]
+        board.unplace(row, col)
+        remaining = board.candidates(row, col) >> last_num  # only numbers above last_num
+        if not remaining:
+            DE += 1
+            continue
+
+        num = last_num + (remaining & -remaining).bit_length()
+        board.place(row, col, num)
+        nodes += 1
+        if index + 1 == len(empty_cells):
+            return True, {"nodes": nodes, "backtracks": DE}
+        NSL.append((index, num))
+        NSL.append((index + 1, 0))
+
+        if progress_callback and nodes % progress_interval == 0:
+            progress_callback(board.grid, nodes)
+        if max_nodes is not None and nodes >= max_nodes:
+            break
+    return False, {"nodes": nodes, "backtracks": DE}
+
+
+def _mrv_search(board, empty_cells, limit=1, progress_callback=None, progress_interval=1000, max_nodes=None):
+    """Most-constrained-first search with single propagation.
+
+    Returns (solutions found, nodes, backtracks), stopping once limit
+    solutions are found; the board then holds the last of them.
+    """
+    units = unit_cells(board.size)
+    trail = []  # every placement made by a guess or by propagation
+    if not propagate(board, units, trail):
+        return 0, 0, 0
+
+    solutions = 0
+    nodes = 0
+    DE = 0  # backtrack count
+    NSL = []  # [cell, untried candidates, trail length before the guess]
+    while True:
+        cell, mask = most_constrained_cell(board, empty_cells)
+        if cell is None:
+            solutions += 1
+            if solutions >= limit:
+                return solutions, nodes, DE
+        elif mask:
+            NSL.append([cell, mask, len(trail)])
+        else:
+            DE += 1  # dead end: undo the last guess
+
+        while NSL:
+            frame = NSL[-1]
+            _undo(board, trail, frame[2])
+            if not frame[1]:
+                NSL.pop()
+                DE += 1
+                continue
+            bit = frame[1] & -frame[1]
+            frame[1] ^= bit
+            board.place(*frame[0], bit.bit_length())
+            trail.append(frame[0])
+            nodes += 1
+            if progress_callback and nodes % progress_interval == 0:
+                progress_callback(board.grid, nodes)
+            if max_nodes is not None and nodes >= max_nodes:
+                return solutions, nodes, DE
+            if propagate(board, units, trail):
+                break
+            DE += 1
         else:
-            # Backtrack if no valid numbers
-            if SL:
-                DE.append(SL.pop())
-                arr[row][col] = 0
-                update_gui(arr)
-                root.after(delay, lambda: solve_sudoku_async(arr, empty_cells, SL, NSL, DE, update_gui, root, delay))
-                return True
-    return False
+            return solutions, nodes, DE
+
+
+def _solve_mrv(board, empty_cells, progress_callback, progress_interval, max_nodes, options):
+    solutions, nodes, DE = _mrv_search(board, empty_cells, 1, progress_callback, progress_interval, max_nodes)
+    return solutions > 0, {"nodes": nodes, "backtracks": DE}
+
+
+def _solve_dlx(board, empty_cells, progress_callback, progress_interval, max_nodes, options):
+    count, solution, nodes = solve_dlx(board.grid, 1, max_nodes)
+    if not count:
+        return False, {"nodes": nodes}
+    for row, col in empty_cells:
+        board.place(row, col, solution[row][col])
+    return True, {"nodes": nodes}
+
+
+def _solve_with_ga(algorithm, board, empty_cells, progress_callback, options):
+    """Run the Generic entry point named algorithm and place its grid if it solves the board.
+
+    progress_callback gets the number of progress reports so far as its count.
+    """
+    import Generic  # imported lazily: pulls in NumPy
+
+    stats = {}
+    callback = None
+    if progress_callback:
+        reports = itertools.count(1)
+        callback = lambda grid: progress_callback(grid, next(reports))
+    solution = getattr(Generic, algorithm)(board.grid, progress_callback=callback, stats=stats, **options)
+    counters = {"generations": stats["generations"]}
+    if not is_solution(solution, board.grid):
+        return False, counters
+    for row, col in empty_cells:
+        board.place(row, col, solution[row][col])
+    return True, counters
+
+
+def _solve_genetic(board, empty_cells, progress_callback, progress_interval, max_nodes, options):
+    return _solve_with_ga("genetic_algorithm", board, empty_cells, progress_callback, options)
+
+
+def _solve_hybrid(board, empty_cells, progress_callback, progress_interval, max_nodes, options):
+    return _solve_with_ga("hybrid_genetic_algorithm", board, empty_cells, progress_callback, options)
+
+
+def _solve_island(board, empty_cells, progress_callback, progress_interval, max_nodes, options):
+    return _solve_with_ga("island_genetic_algorithm", board, empty_cells, progress_callback, options)
+
+
+SEARCH_METHODS = {
+    "ordered": _solve_ordered,  # row-major cell order (or options["cell_order"]), numbers tried 1..board_size
+    "mrv": _solve_mrv,  # most-constrained cell first, with single propagation
+    "dlx": _solve_dlx,  # exact cover with Dancing Links; progress is not reported
+    "genetic": _solve_genetic,  # Generic.genetic_algorithm; max_nodes is not used
+    "hybrid": _solve_hybrid,  # Generic.hybrid_genetic_algorithm: GA, local search, exact fallback
+    "island": _solve_island,  # Generic.island_genetic_algorithm: GA islands in separate processes
+}
+
+
+def is_solution(solution, puzzle):
+    """True when solution is complete, breaks no rule and keeps the givens."""
+    if solution is None or not BitBoard([row[:] for row in solution]).valid:
+        return False
+    return all(
+        value and (given == 0 or given == value)
+        for solution_row, puzzle_row in zip(solution, puzzle)
+        for value, given in zip(solution_row, puzzle_row)
+    )
+
+
+def solve(grid, board_size, method="ordered", progress_callback=None, progress_interval=1000, max_nodes=None,
+          instrumentation=None, **options):
+    """Solve a Sudoku without a GUI and return a SolveResult.
+
+    The input grid is left untouched. method selects the search: "ordered"
+    is the cell-by-cell backtracking of session.BacktrackingSession, run to
+    the end in one loop; "mrv" picks the cell with the fewest candidates
+    next and places naked and hidden singles after every guess; "dlx"
+    solves the exact-cover form with Dancing Links (see dlx.py); "genetic"
+    runs Generic.genetic_algorithm, "hybrid"
+    Generic.hybrid_genetic_algorithm and "island"
+    Generic.island_genetic_algorithm, with any extra keyword options (seed,
+    population_size, generations, time_limit, islands, ...) passed through.
+    progress_callback, if given, is called as progress_callback(grid,
+    nodes) every progress_interval guesses (every generation for "genetic"
+    and "hybrid", every improvement for "island"); max_nodes caps the
+    search. If an Instrumentation is given the search is timed, every
+    progress report is recorded as a "progress" event and the result's
+    counters are added to it. A grid of the wrong shape or with a value
+    outside 0..board_size raises ValueError before any search runs.
+    """
+    if method not in SEARCH_METHODS:
+        raise ValueError(f"Unknown solve method: {method}")
+    start = time.perf_counter()
+    arr = [row[:] for row in grid]
+    if len(arr) != board_size or any(len(row) != board_size for row in arr):
+        raise ValueError(f"Expected a {board_size}x{board_size} grid")
+    if any(isinstance(num, bool) or not isinstance(num, int) or not 0 <= num <= board_size for row in arr for num in row):
+        raise ValueError(f"Grid values must be integers from 0 to {board_size}")
+    board = BitBoard(arr)
+    if not board.valid:
+        return SolveResult(None, elapsed=time.perf_counter() - start)
+
+    empty_cells = [(row, col) for row in range(board_size) for col in range(board_size) if arr[row][col] == 0]
+    solved, counters = True, {}
+    if empty_cells:
+        if instrumentation is None:
+            solved, counters = SEARCH_METHODS[method](
+                board, empty_cells, progress_callback, progress_interval, max_nodes, options
+            )
+        else:
+            solved, counters = _instrumented(
+                instrumentation, method, board, empty_cells, progress_callback, progress_interval, max_nodes, options
+            )
+    return SolveResult(arr if solved else None, elapsed=time.perf_counter() - start, **counters)
+
+
+def _instrumented(instrumentation, method, board, empty_cells, progress_callback, progress_interval, max_nodes, options):
+    def report(grid, nodes):
+        instrumentation.event("progress", nodes=nodes)
+        if progress_callback:
+            progress_callback(grid, nodes)
+
+    with instrumentation.timer("search", method=method, empty=len(empty_cells)):
+        solved, counters = SEARCH_METHODS[method](board, empty_cells, report, progress_interval, max_nodes, options)
+    for name, value in counters.items():
+        instrumentation.count(name, value)
+    instrumentation.count("solved" if solved else "unsolved")
+    return solved, counters
@@ -0,0 +1,62 @@
+import asyncio
+import json
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+import service  # noqa: E402
+
+PUZZLE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src", "puzzles")
+
+
+def first_puzzle(name):
+    with open(os.path.join(PUZZLE_DIR, name)) as corpus:
+        return corpus.readline().strip()
+
+
+class ParseRequestTest(unittest.TestCase):
+    def test_boolean_grid_values_are_rejected(self):
+        grid = [[0] * 9 for _ in range(9)]
+        grid[0][0] = True
+        with self.assertRaises(service.RequestError) as caught:
+            service.parse_request(json.dumps({"grid": grid}).encode())
+        self.assertEqual(caught.exception.status, 400)
+
+
+class ServiceTimeoutTest(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        started = asyncio.get_running_loop().create_future()
+        self.server = asyncio.create_task(service.serve(port=0, workers=1, ready=started.set_result))
+        self.port = await asyncio.wait_for(started, 60)
+
+    async def asyncTearDown(self):
+        self.server.cancel()
+        with self.assertRaises(asyncio.CancelledError):
+            await self.server
+
+    async def post(self, request):
+        """POST /solve and read the response to EOF, as a Connection: close client does."""
+        reader, writer = await asyncio.open_connection("127.0.0.1", self.port)
+        body = json.dumps(request).encode()
+        writer.write(b"POST /solve HTTP/1.1\r\nContent-Length: %d\r\n\r\n" % len(body) + body)
+        await writer.drain()
+        try:
+            response = await asyncio.wait_for(reader.read(), 10)  # hangs if a worker holds the socket
+        finally:
+            writer.close()
+        head, _, payload = response.partition(b"\r\n\r\n")
+        return int(head.split()[1]), json.loads(payload)
+
+    async def test_timed_out_request_is_closed_and_worker_replaced(self):
+        status, payload = await self.post({"puzzle": first_puzzle("17clue.txt"), "method": "backtracking", "timeout": 0.5})
+        self.assertEqual(status, 504, payload)
+
+        status, payload = await self.post({"puzzle": first_puzzle("easy.txt"), "method": "mrv", "timeout": 30})
+        self.assertEqual(status, 200, payload)
+        self.assertTrue(payload["solved"])
+
+
+if __name__ == "__main__":
+    unittest.main()